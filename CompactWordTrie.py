@@ -0,0 +1,166 @@
+import mmap
+import os
+import sys
+from array import array
+from WordTrie import WordTrie
+from WordDawg import WordDawg
+
+# File layout (all native-endian uint32):
+#   header: MAGIC, VERSION, node_count, edge_count, word_len_min, word_len_max
+#   nodes:  node_count pairs of (first_edge, letter_mask << 1 | is_word)
+#   edges:  edge_count entries of (child_index << 5 | letter_index), sorted by letter
+# Bit i of letter_mask is set when the node has a child for LETTERS[i], so a step is a
+# bit test and the child's edge is at first_edge + the number of lower letters set.
+# Node 0 is the root. Nodes are only referenced by index, so a graph with shared
+# children (e.g. a DAWG) is written once per unique node.
+MAGIC = 0x57545249  # "WTRI"
+VERSION = 2
+HEADER_FIELDS = 6
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def read_word_list(word_file, wordLenMin=None, wordLenMax=None):
+    words = []
+    with open(word_file, "r") as file:
+        for line in file:
+            word = line.strip()
+            if not word:  # Skip empty lines.
+                continue
+            if wordLenMax is not None and len(word) > wordLenMax:
+                continue
+            if wordLenMin is not None and len(word) < wordLenMin:
+                continue
+            words.append(word)
+    return words
+
+
+def write_compact_trie(trie, output_path, wordLenMin=None, wordLenMax=None):
+    """
+    Serialises an in-memory trie (anything built from TrieNode objects) into the flat
+    array layout described at the top of this module.
+    """
+    node_index = {id(trie.root): 0}
+    order = [trie.root]
+    i = 0
+    while i < len(order):
+        for letter in sorted(order[i].children):
+            child = order[i].children[letter]
+            if id(child) not in node_index:
+                node_index[id(child)] = len(order)
+                order.append(child)
+        i += 1
+
+    nodes = array("I")
+    edges = array("I")
+    for node in order:
+        nodes.append(len(edges))
+        letter_mask = sum(1 << LETTERS.index(letter) for letter in node.children)
+        nodes.append((letter_mask << 1) | int(node.is_word))
+        for letter in sorted(node.children):
+            edges.append((node_index[id(node.children[letter])] << 5) | LETTERS.index(letter))
+
+    header = array("I", [MAGIC, VERSION, len(order), len(edges), wordLenMin or 0, wordLenMax or 0])
+    with open(output_path, "wb") as file:
+        header.tofile(file)
+        nodes.tofile(file)
+        edges.tofile(file)
+    return len(order), len(edges)
+
+
+def build_compact_trie(word_file, output_path, wordLenMin=None, wordLenMax=None, minimise=False):
+    trie = WordDawg() if minimise else WordTrie()
+    for word in read_word_list(word_file, wordLenMin, wordLenMax):
+        trie.insert(word)
+    if minimise:
+        trie.freeze()
+    return write_compact_trie(trie, output_path, wordLenMin, wordLenMax)
+
+
+class CompactWordTrie:
+    """
+    Read-only trie backed by a memory-mapped artifact written by build_compact_trie.
+    Offers the same search() as WordTrie without creating a Python object per node, and
+    processes loading the same file share its pages.
+    """
+    def __init__(self, artifact_path):
+        with open(artifact_path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        data = memoryview(self._mmap).cast("I")
+        if len(data) < HEADER_FIELDS or data[0] != MAGIC:
+            raise ValueError(f"{artifact_path} is not a compact trie artifact (or was built with a different byte order).")
+        if data[1] != VERSION:
+            raise ValueError(f"{artifact_path} has version {data[1]}, expected {VERSION}. Rebuild it.")
+        node_count, edge_count = data[2], data[3]
+        self.wordLenMin = data[4] or None
+        self.wordLenMax = data[5] or None
+        self.node_count = node_count
+        self.edge_count = edge_count
+        self._nodes = data[HEADER_FIELDS:HEADER_FIELDS + 2 * node_count]
+        self._edges = data[HEADER_FIELDS + 2 * node_count:HEADER_FIELDS + 2 * node_count + edge_count]
+        self.root = 0
+
+    def step(self, node, letter: str):
+        """
+        Cursor-style traversal matching WordTrie.step; nodes are indices into the artifact.
+        """
+        code = ord(letter) - 65
+        if not 0 <= code < 26:
+            return None
+        nodes = self._nodes
+        letter_mask = nodes[2 * node + 1] >> 1
+        bit = 1 << code
+        if not letter_mask & bit:
+            return None
+        return self._edges[nodes[2 * node] + (letter_mask & (bit - 1)).bit_count()] >> 5
+
+    def is_word(self, node):
+        return bool(self._nodes[2 * node + 1] & 1)
+
+    def search(self, prefix: str):
+        """
+        Returns a tuple:
+         - A boolean indicating if the prefix itself is a complete word.
+         - A list of characters that represent the immediate branches from that prefix.
+        """
+        node = self.root
+        for char in prefix.upper():
+            node = self.step(node, char)
+            if node is None:
+                return (False, [])
+        first = self._nodes[2 * node]
+        info = self._nodes[2 * node + 1]
+        return (bool(info & 1), [LETTERS[self._edges[i] & 31] for i in range(first, first + (info >> 1).bit_count())])
+
+
+def is_artifact_fresh(word_file, artifact_path, wordLenMin=None, wordLenMax=None):
+    """
+    True if artifact_path exists, is newer than word_file and was built with the same
+    length filter.
+    """
+    if not os.path.exists(artifact_path):
+        return False
+    if os.path.getmtime(artifact_path) < os.path.getmtime(word_file):
+        return False
+    header = array("I")
+    with open(artifact_path, "rb") as file:
+        try:
+            header.fromfile(file, HEADER_FIELDS)
+        except EOFError:
+            return False
+    return (header[0] == MAGIC and header[1] == VERSION
+            and (header[4] or None) == wordLenMin and (header[5] or None) == wordLenMax)
+
+
+if __name__ == "__main__":
+    # Usage: python CompactWordTrie.py [--dawg] [word_file] [output_path] [wordLenMin] [wordLenMax]
+    minimise = "--dawg" in sys.argv
+    args = [arg for arg in sys.argv[1:] if arg != "--dawg"]
+    word_file = args[0] if len(args) > 0 else "english_words.txt"
+    output_path = args[1] if len(args) > 1 else "english_words.trie"
+    wordLenMin = int(args[2]) if len(args) > 2 else 4
+    wordLenMax = int(args[3]) if len(args) > 3 else 19
+    node_count, edge_count = build_compact_trie(word_file, output_path, wordLenMin, wordLenMax, minimise)
+    print(f"Wrote {output_path}: {node_count} nodes, {edge_count} edges, {os.path.getsize(output_path)} bytes")
+
+    trie = CompactWordTrie(output_path)
+    print(trie.search("jazz"))
@@ -7,9 +7,13 @@ import ttkbootstrap as ttk
 from ttkbootstrap.widgets import DateEntry
 
 class ConnectionsPuzzle:
-    def __init__(self, print_date, editor):
+    def __init__(self, print_date, editor, seed=None):
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.status = "OK"
-        self.id = random.randint(100, 999)
+        self.id = self.rng.randint(100, 999)
         self.print_date = print_date
         self.editor = editor
         self.categories = [{}, {}, {}, {}]
@@ -27,7 +31,7 @@ class ConnectionsPuzzle:
         self.categories[self.catagoryPointer]["cards"] = [{}, {}, {}, {}]
         for index, word in enumerate(cards):
             self.categories[self.catagoryPointer]["cards"][index]["content"] = word.upper()
-            self.categories[self.catagoryPointer]["cards"][index]["position"] = random.choice(self.avaliableGridPositions)
+            self.categories[self.catagoryPointer]["cards"][index]["position"] = self.rng.choice(self.avaliableGridPositions)
             self.avaliableGridPositions.remove(self.categories[self.catagoryPointer]["cards"][index]["position"])
         self.catagoryPointer += 1
 
@@ -67,6 +71,7 @@ def create_json():
 
     # Create a puzzle instance
     puzzle = ConnectionsPuzzle(print_date=print_date, editor=editor_name)
+    print(f"ConnectionsPuzzle seed: {puzzle.seed}")
 
     # Retrieve category title and card words for each of the 4 categories.
     for i in range(4):
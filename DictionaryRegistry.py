@@ -0,0 +1,42 @@
+import os
+import threading
+from WordTrie import WordTrie
+from CompactWordTrie import CompactWordTrie, is_artifact_fresh, read_word_list
+
+# Built dictionaries, keyed by (absolute word file path, its mtime, wordLenMin, wordLenMax).
+# Every caller asking for the same key gets the same read-only trie.
+_dictionaries = {}
+_lock = threading.Lock()
+
+
+def get_dictionary(word_file="english_words.txt", wordLenMin=None, wordLenMax=None, artifact_path=None):
+    """
+    Returns the shared trie for word_file filtered to wordLenMin..wordLenMax, building it
+    on first use. A fresh compact artifact (default: word_file with a .trie extension)
+    is memory-mapped instead of building a WordTrie. Editing word_file changes its mtime,
+    so the next call rebuilds and the stale entry is dropped.
+    """
+    path = os.path.abspath(word_file)
+    mtime = os.path.getmtime(path)
+    key = (path, mtime, wordLenMin, wordLenMax)
+    with _lock:
+        if key in _dictionaries:
+            return _dictionaries[key]
+        if artifact_path is None:
+            artifact_path = os.path.splitext(path)[0] + ".trie"
+        if is_artifact_fresh(path, artifact_path, wordLenMin, wordLenMax):
+            trie = CompactWordTrie(artifact_path)
+        else:
+            trie = WordTrie()
+            for word in read_word_list(path, wordLenMin, wordLenMax):
+                trie.insert(word)
+            trie.frozen = True
+        for stale in [k for k in _dictionaries if k[0] == path and k[2:] == key[2:]]:
+            del _dictionaries[stale]
+        _dictionaries[key] = trie
+        return trie
+
+
+def clear_dictionaries():
+    with _lock:
+        _dictionaries.clear()
@@ -356,6 +356,20 @@ const serial_to_dict = (spangram, spangramloc, words, loc) => {
     console.log(MANUAL_DICT)
 }
 
+const wait_for_job = (job, interval = 1000) => {
+    return fetch(`generate/${job}`)
+    .then(response => response.json())
+    .then(data => {
+        if (data['status'] === 'done') {
+            return data
+        }
+        if (data['status'] === 'failed' || data['error']) {
+            throw new Error(data['error'])
+        }
+        return new Promise(resolve => setTimeout(resolve, interval)).then(() => wait_for_job(job, interval))
+    })
+}
+
 const call_generate = (e) => {
     e.preventDefault(); // Prevent the default form submission
     form = document.getElementById("generate")
@@ -374,6 +388,13 @@ const call_generate = (e) => {
         }
     })
     .then(response => response.json()) // Convert the response to JSON
+    .then(data => {
+        if (data['error']) {
+            throw new Error(data['error'])
+        }
+        // Generation runs as a queued job; poll it until it is done.
+        return wait_for_job(data['job'])
+    })
     .then(data => {
         fill_hidden_fields(data['spangram'], data['spangramloc'], data['words'], data['loc'])
         fill_table(data['spangram'], data['spangramloc'], data['words'], data['loc'])
@@ -0,0 +1,137 @@
+import json
+import random
+import sqlite3
+from contextlib import closing
+from StrandsSolver import GridBitmasks, PlacedLetters
+
+# One row per layout found by the search (table layouts):
+#   rows, cols, direction  the grid and spangram direction it was found for
+#   lengths                "<spangram length>:<theme lengths, sorted>", e.g. "8:5,5,5,5,6,6,8"
+#   layout                 JSON {"spangram": path, "strands": [path, ...]} with the theme
+#                          paths sorted by length, then by path; paths are grid node labels
+# A layout only depends on the strand lengths, so it can be reused for any words with the
+# same length profile once their letters have been checked on it.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS layouts (
+    id INTEGER PRIMARY KEY,
+    rows INTEGER NOT NULL,
+    cols INTEGER NOT NULL,
+    direction TEXT NOT NULL,
+    lengths TEXT NOT NULL,
+    layout TEXT NOT NULL,
+    UNIQUE (rows, cols, direction, lengths, layout)
+);
+"""
+
+
+def length_key(spangram_length, theme_lengths):
+    return f"{spangram_length}:{','.join(str(length) for length in sorted(theme_lengths))}"
+
+
+class LayoutCache:
+    """
+    Layouts from earlier searches, stored in an SQLite file so every process and run shares
+    them. lookup deals out the words onto a stored layout, so a hit costs a board scan
+    instead of a search.
+    """
+    def __init__(self, grid, path="layout_cache.sqlite"):
+        self.grid = grid
+        self.path = path
+        self.rows, self.cols = len(grid), len(grid[0])
+        self.masks = GridBitmasks(grid)
+        self.node_to_coord = {node: (i, j) for i, row in enumerate(grid) for j, node in enumerate(row)}
+        with closing(self.connect()) as connection, connection:
+            connection.executescript(SCHEMA)
+
+    def connect(self):
+        # Several worker processes may write at once; wait for the lock rather than fail.
+        return sqlite3.connect(self.path, timeout=30)
+
+    def store(self, solution, direction):
+        """
+        Saves a layout returned by solve_partition (strand name -> path, with the spangram
+        under "SPANGRAM"). Storing a layout twice keeps one copy.
+        """
+        strands = sorted((list(path) for name, path in solution.items() if name != "SPANGRAM"), key=lambda path: (len(path), path))
+        layout = json.dumps({"spangram": list(solution["SPANGRAM"]), "strands": strands})
+        key = length_key(len(solution["SPANGRAM"]), [len(path) for path in strands])
+        with closing(self.connect()) as connection, connection:
+            connection.execute("INSERT OR IGNORE INTO layouts (rows, cols, direction, lengths, layout) VALUES (?, ?, ?, ?, ?)",
+                               (self.rows, self.cols, direction, key, layout))
+
+    def count(self, words, direction):
+        with closing(self.connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM layouts WHERE rows = ? AND cols = ? AND direction = ? AND lengths = ?",
+                                      (self.rows, self.cols, direction, self.words_key(words))).fetchone()[0]
+
+    def words_key(self, words):
+        return length_key(len(words["SPANGRAM"]), [len(word) for name, word in words.items() if name != "SPANGRAM"])
+
+    def lookup(self, words, direction, is_valid=None, rng=random, max_steps=2000):
+        """
+        Returns a solution for words (strand name -> letters, as for solve_partition) built
+        from a stored layout of the same length profile, or None. Stored layouts are tried
+        in random order, each in a random mirror image. The words are dealt onto a layout's
+        paths by backtracking over which word of a length takes which path and in which
+        direction, cutting any placement that lets a word be traced twice (PlacedLetters);
+        a complete assignment goes to is_valid for the full board check. max_steps bounds
+        the placements tried per layout.
+        """
+        with closing(self.connect()) as connection:
+            rows = connection.execute("SELECT layout FROM layouts WHERE rows = ? AND cols = ? AND direction = ? AND lengths = ?",
+                                      (self.rows, self.cols, direction, self.words_key(words))).fetchall()
+        layouts = [json.loads(row[0]) for row in rows]
+        rng.shuffle(layouts)
+        for layout in layouts:
+            paths = self.mirror([layout["spangram"]] + layout["strands"][::-1], rng)
+            solution = self.assign_words(paths, words, PlacedLetters(self.masks, words), is_valid, rng, max_steps)
+            if solution is not None:
+                return solution
+        return None
+
+    def mirror(self, paths, rng):
+        """
+        The paths under a random one of the grid's symmetries, which keep every layout
+        valid and its spangram touching the same pair of walls.
+        """
+        flip_rows, flip_cols = rng.random() < 0.5, rng.random() < 0.5
+        mirrored = []
+        for path in paths:
+            cells = [self.node_to_coord[node] for node in path]
+            mirrored.append([self.grid[self.rows - 1 - r if flip_rows else r][self.cols - 1 - c if flip_cols else c] for r, c in cells])
+        return mirrored
+
+    def assign_words(self, paths, words, placed_letters, is_valid, rng, max_steps):
+        """
+        Backtracking over paths[0] (the spangram's) then paths[1:] (longest first).
+        """
+        solution = {}
+        free_names = [name for name in words if name != "SPANGRAM"]
+        steps = max_steps
+
+        def place(index):
+            nonlocal steps
+            if index == len(paths):
+                return is_valid is None or is_valid(dict(solution))
+            path = paths[index]
+            names = ["SPANGRAM"] if index == 0 else [name for name in free_names if len(words[name]) == len(path)]
+            options = [(name, oriented) for name in names for oriented in (path, path[::-1])]
+            rng.shuffle(options)
+            for name, oriented in options:
+                steps -= 1
+                if steps < 0:
+                    return False
+                solution[name] = oriented
+                if name != "SPANGRAM":
+                    free_names.remove(name)
+                if placed_letters.place(name, oriented) and place(index + 1):
+                    return True
+                placed_letters.remove(name, oriented)
+                if name != "SPANGRAM":
+                    free_names.append(name)
+                del solution[name]
+            return False
+
+        if place(0):
+            return solution
+        return None
@@ -0,0 +1,50 @@
+import json
+from contextlib import contextmanager
+
+# The collector the search code reports to. None (the default) means metrics are off and
+# every instrumented spot costs a single `is not None` check.
+active = None
+
+
+class SearchMetrics:
+    """
+    Counters, timers and per-solve reports gathered while enabled with collect_metrics.
+    Only searches run in this process are seen; the workers of
+    StrandsSolver.solve_partition_parallel report nothing.
+    """
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}
+        self.solves = []
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, name, seconds):
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def report(self):
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "timers": dict(sorted(self.timers.items())),
+            "solves": self.solves,
+        }
+
+    def dump_json(self, file_path):
+        with open(file_path, "w") as f:
+            json.dump(self.report(), f, indent=4)
+
+
+@contextmanager
+def collect_metrics(metrics=None):
+    """
+    Turns metrics on for the body of the with block and yields the collector (a new
+    SearchMetrics unless one is passed in). The previous collector is restored on exit.
+    """
+    global active
+    previous = active
+    active = metrics if metrics is not None else SearchMetrics()
+    try:
+        yield active
+    finally:
+        active = previous
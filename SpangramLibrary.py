@@ -0,0 +1,193 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from StrandsSolver import GridBitmasks, diagonal_of
+
+# File layout (JSON):
+#   {"version", "rows", "cols", "minFree",
+#    "paths": {direction: {length: [[cells, regions], ...]}}}
+# A cell is row * cols + col; regions are the sizes of the two free regions the path
+# leaves, largest first. Every path touches both walls of its direction, does not cross
+# itself diagonally and leaves exactly two free regions of at least minFree cells, i.e. it
+# passes check_spangram_constraint and the size part of check_spangram_separation_rule.
+VERSION = 1
+DIRECTIONS = ("left-right", "top-bottom")
+MIN_FREE = 10
+
+# Loaded libraries, keyed by (absolute path, mtime).
+_libraries = {}
+_lock = threading.Lock()
+
+
+def path_diagonals(cells, cols):
+    diagonals = {}
+    for a, b in zip(cells, cells[1:]):
+        diagonal = diagonal_of(a, b, cols)
+        if diagonal is not None:
+            diagonals[diagonal[0]] = diagonal[1]
+    return diagonals
+
+
+def sample_spangram_path(rows, cols, length, direction, rng, masks, min_free=MIN_FREE, node_budget=2000):
+    """
+    Random depth-first walk from a random cell for a path of length cells that the solver
+    would accept as a spangram. Walks that can no longer reach both walls are cut as they
+    go. Returns (cells, regions), or None if node_budget steps pass without one.
+    """
+    axis_size = rows if direction == "top-bottom" else cols
+    last = axis_size - 1
+
+    def line(cell):
+        return cell // cols if direction == "top-bottom" else cell % cols
+
+    path = [rng.randrange(rows * cols)]
+    used = {path[0]}
+    diagonals = {}
+    budget = node_budget
+
+    def walls_reachable():
+        lines = [line(cell) for cell in path]
+        head = lines[-1]
+        cells_left = length - len(path)
+        low = 0 in lines
+        high = last in lines
+        if low and high:
+            return True
+        if low:
+            return last - head <= cells_left
+        if high:
+            return head <= cells_left
+        return min(head, last - head) + last <= cells_left
+
+    def extend():
+        nonlocal budget
+        budget -= 1
+        if budget < 0:
+            return None
+        if len(path) == length:
+            regions = sorted(masks.component_sizes(masks.full & ~masks.mask_of(path)), reverse=True)
+            if len(regions) == 2 and regions[-1] >= min_free and walls_reachable():
+                return list(path), regions
+            return None
+        if not walls_reachable():
+            return None
+        r, c = divmod(path[-1], cols)
+        neighbours = [(r + dr) * cols + c + dc
+                      for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                      if (dr or dc) and 0 <= r + dr < rows and 0 <= c + dc < cols]
+        rng.shuffle(neighbours)
+        for neighbour in neighbours:
+            if neighbour in used:
+                continue
+            diagonal = diagonal_of(path[-1], neighbour, cols)
+            claimed = False
+            if diagonal is not None:
+                square_key, diag_type = diagonal
+                if diagonals.get(square_key, diag_type) != diag_type:
+                    continue
+                if square_key not in diagonals:
+                    diagonals[square_key] = diag_type
+                    claimed = True
+            path.append(neighbour)
+            used.add(neighbour)
+            result = extend()
+            if result is not None:
+                return result
+            path.pop()
+            used.remove(neighbour)
+            if claimed:
+                del diagonals[square_key]
+            if budget < 0:
+                return None
+        return None
+
+    return extend()
+
+
+def build_spangram_library(output_path, rows=8, cols=6, lengths=range(6, 20), paths_per_key=500, seed=0, min_free=MIN_FREE, max_attempts=None):
+    """
+    Samples up to paths_per_key distinct spangram paths for every length and direction
+    and writes them to output_path. Lengths that cannot span the grid, or that leave too
+    few cells for two regions of min_free, simply get no paths.
+    """
+    rng = random.Random(seed)
+    masks = GridBitmasks([[r * cols + c for c in range(cols)] for r in range(rows)])
+    if max_attempts is None:
+        max_attempts = 20 * paths_per_key
+    library = {}
+    for direction in DIRECTIONS:
+        library[direction] = {}
+        span = rows if direction == "top-bottom" else cols
+        for length in lengths:
+            if length < span or rows * cols - length < 2 * min_free:
+                continue
+            found = {}
+            for _ in range(max_attempts):
+                if len(found) >= paths_per_key:
+                    break
+                sample = sample_spangram_path(rows, cols, length, direction, rng, masks, min_free)
+                if sample is not None:
+                    found.setdefault(tuple(sample[0]), sample[1])
+            library[direction][str(length)] = [[list(cells), regions] for cells, regions in found.items()]
+    with open(output_path, "w") as file:
+        json.dump({"version": VERSION, "rows": rows, "cols": cols, "minFree": min_free, "paths": library}, file)
+    return library
+
+
+def load_spangram_library(library_path):
+    """
+    Reads a library written by build_spangram_library. The parsed file is shared by every
+    caller in the process until the file changes.
+    """
+    path = os.path.abspath(library_path)
+    key = (path, os.path.getmtime(path))
+    with _lock:
+        if key not in _libraries:
+            with open(path, "r") as file:
+                library = json.load(file)
+            if library.get("version") != VERSION:
+                raise ValueError(f"{library_path} has version {library.get('version')}, expected {VERSION}. Rebuild it.")
+            for stale in [k for k in _libraries if k[0] == path]:
+                del _libraries[stale]
+            _libraries[key] = library
+        return _libraries[key]
+
+
+def get_spangram_paths(grid, length, direction, library_path="spangram_paths.json", min_paths=50):
+    """
+    Returns the library's spangram paths for this length and direction as
+    (nodes, regions, diagonals) tuples in grid's node labels, ready for
+    solve_partition(spangram_paths=...). Returns None when there is no library file, it was
+    built for a different grid size, or it has fewer than min_paths paths of this length
+    (too few to be sure one fits the other strands), so callers fall back to searching for
+    the spangram.
+    """
+    if not os.path.exists(library_path):
+        return None
+    library = load_spangram_library(library_path)
+    rows, cols = len(grid), len(grid[0])
+    if library["rows"] != rows or library["cols"] != cols:
+        return None
+    entries = library["paths"].get(direction, {}).get(str(length))
+    if entries is None or len(entries) < min_paths:
+        return None
+    paths = []
+    for cells, regions in entries:
+        nodes = [grid[cell // cols][cell % cols] for cell in cells]
+        paths.append((nodes, regions, path_diagonals(cells, cols)))
+    return paths
+
+
+if __name__ == "__main__":
+    # Usage: python SpangramLibrary.py [output_path] [paths_per_key] [seed]
+    output_path = sys.argv[1] if len(sys.argv) > 1 else "spangram_paths.json"
+    paths_per_key = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    start = time.time()
+    library = build_spangram_library(output_path, paths_per_key=paths_per_key, seed=seed)
+    for direction, by_length in library.items():
+        print(direction, {length: len(paths) for length, paths in by_length.items()})
+    print(f"Wrote {output_path} in {time.time() - start:.1f}s, {os.path.getsize(output_path)} bytes")
@@ -0,0 +1,114 @@
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+from datetime import datetime
+import SearchMetrics
+import StrandsSolver
+from StrandsCreator import StrandsPuzzle, check_puzzle_inputs
+
+# Input rows (CSV with a header row, or one JSON object per line) use these fields:
+#   date        YYYY-MM-DD publication date
+#   editor      editor name (falls back to --editor)
+#   theme_words list, or a string separated by commas, semicolons or spaces
+#   spangram
+#   clue
+#   direction   "left-right" or "top-bottom" (defaults to "left-right")
+#   output      optional file name; defaults to <date>.json inside --output-dir
+
+
+def read_rows(input_path):
+    if input_path.endswith(".jsonl"):
+        rows = []
+        with open(input_path, "r") as file:
+            for line in file:
+                if line.strip():
+                    rows.append(json.loads(line))
+        return rows
+    with open(input_path, "r", newline="") as file:
+        return list(csv.DictReader(file))
+
+
+def parse_row(row, default_editor):
+    theme_words = row.get("theme_words") or []
+    if isinstance(theme_words, str):
+        theme_words = re.split(r"[,;\s]+", theme_words)
+    theme_words = [word.strip().upper() for word in theme_words if word.strip()]
+    spangram = (row.get("spangram") or "").strip().upper()
+    clue = (row.get("clue") or "").strip()
+    direction = (row.get("direction") or "left-right").strip()
+    editor = (row.get("editor") or default_editor or "").strip()
+
+    error = check_puzzle_inputs(theme_words, spangram, clue)
+    if error is None and not editor:
+        error = "Editor Name is required."
+    if error is None and direction not in ("left-right", "top-bottom"):
+        error = f"Invalid direction '{direction}'. Use 'left-right' or 'top-bottom'."
+    if error is not None:
+        raise ValueError(error)
+    print_date = datetime.strptime((row.get("date") or "").strip(), "%Y-%m-%d")
+    return print_date, editor, theme_words, spangram, clue, direction
+
+
+def run_batch(input_path, output_dir, default_editor=None, processes=1, seed=None, restart_iterations=StrandsSolver.DEFAULT_RESTART_ITERATIONS, time_limit=None, metrics_path=None, layout_cache="layout_cache.sqlite"):
+    """
+    Generates one NYT-format JSON file per input row without the GUI. Every puzzle uses
+    the same dictionary from DictionaryRegistry. Rows that fail, including layout searches
+    that run past time_limit seconds, are reported and skipped.
+    Layouts are reused from and added to the layout_cache file (None disables it).
+    With metrics_path, the search metrics of every row are written there as a JSON list.
+    Returns the list of (row number, error message) failures.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rows = read_rows(input_path)
+    failures = []
+    reports = []
+    for row_number, row in enumerate(rows, start=1):
+        metrics = SearchMetrics.SearchMetrics() if metrics_path else None
+        try:
+            print_date, editor, theme_words, spangram, clue, direction = parse_row(row, default_editor)
+            puzzle = StrandsPuzzle(print_date, editor)
+            puzzle.add_theme_words(theme_words)
+            puzzle.add_spangram(spangram)
+            puzzle.add_clue(clue)
+            if metrics is not None:
+                with SearchMetrics.collect_metrics(metrics):
+                    puzzle.solve_for_strands(direction, processes, seed, restart_iterations, time_limit, layout_cache)
+                    puzzle.find_all_possible_words()
+            else:
+                puzzle.solve_for_strands(direction, processes, seed, restart_iterations, time_limit, layout_cache)
+                puzzle.find_all_possible_words()
+            file_path = os.path.join(output_dir, row.get("output") or f"{print_date.strftime('%Y-%m-%d')}.json")
+            puzzle.dump_json(file_path)
+            print(f"Row {row_number}: wrote {file_path}", file=sys.stderr)
+        except Exception as e:
+            print(f"Row {row_number}: failed: {e}", file=sys.stderr)
+            failures.append((row_number, str(e)))
+        if metrics is not None:
+            reports.append({"row": row_number, **metrics.report()})
+    if metrics_path:
+        with open(metrics_path, "w") as file:
+            json.dump(reports, file, indent=4)
+    print(f"Generated {len(rows) - len(failures)} of {len(rows)} puzzles.", file=sys.stderr)
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate Strands puzzle JSON files from a CSV or JSONL file.")
+    parser.add_argument("input", help="CSV (with header) or .jsonl file of puzzles.")
+    parser.add_argument("--output-dir", default=".", help="Directory for the generated JSON files.")
+    parser.add_argument("--editor", help="Editor name for rows without one.")
+    parser.add_argument("--processes", type=int, default=1, help="Parallel layout searches per puzzle.")
+    parser.add_argument("--seed", type=int, help="Seed for every puzzle's layout search.")
+    parser.add_argument("--restart-iterations", type=int, default=StrandsSolver.DEFAULT_RESTART_ITERATIONS,
+                        help="Base dfs_extend budget of the Luby restart schedule (0 disables restarts).")
+    parser.add_argument("--time-limit", type=float, help="Seconds allowed for each puzzle's layout search.")
+    parser.add_argument("--metrics", help="Write search counters and timings for every row to this JSON file.")
+    parser.add_argument("--layout-cache", default="layout_cache.sqlite", help="SQLite file of layouts reused across runs.")
+    parser.add_argument("--no-layout-cache", action="store_true", help="Always search for a fresh layout.")
+    args = parser.parse_args()
+
+    failures = run_batch(args.input, args.output_dir, args.editor, args.processes, args.seed, args.restart_iterations or None, args.time_limit, args.metrics, None if args.no_layout_cache else args.layout_cache)
+    sys.exit(1 if failures else 0)
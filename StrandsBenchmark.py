@@ -0,0 +1,225 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+import StrandsSolver
+import StrandsWordFinder
+from StrandsSolverV2 import StrandsSolverV2
+from WordTrie import WordTrie
+from DictionaryRegistry import get_dictionary
+from SpangramLibrary import get_spangram_paths
+
+GRID = [
+    [1, 2, 3, 4, 5, 6],
+    [7, 8, 9, 10, 11, 12],
+    [13, 14, 15, 16, 17, 18],
+    [19, 20, 21, 22, 23, 24],
+    [25, 26, 27, 28, 29, 30],
+    [31, 32, 33, 34, 35, 36],
+    [37, 38, 39, 40, 41, 42],
+    [43, 44, 45, 46, 47, 48]
+]
+
+# Fixed corpus of 48-letter puzzles. Keep existing entries unchanged so results stay
+# comparable across commits; add new ones at the end.
+CORPUS = {
+    "CHICKENSOUP": {
+        "themeWords": ["CARROTS", "CELERY", "NOODLES", "ONIONS", "PEPPER", "STOCK"],
+        "spangram": "CHICKENSOUP",
+        "direction": "top-bottom",
+    },
+    "EXERCISE": {
+        "themeWords": ["BURPEE", "CRUNCH", "DEADLIFT", "LUNGE", "PLANK", "SITUP", "SQUAT"],
+        "spangram": "EXERCISE",
+        "direction": "left-right",
+    },
+    "ORCHARDS": {
+        "themeWords": ["APPLE", "GRAPE", "LEMON", "MELON", "PEACH", "GUAVA", "MANGO", "OLIVE"],
+        "spangram": "ORCHARDS",
+        "direction": "left-right",
+    },
+    "ACCOMMODATIVENESSES": {
+        "themeWords": ["PURPLE", "GRAPE", "STAIN", "SLATE", "PLANT", "TEE"],
+        "spangram": "ACCOMMODATIVENESSES",
+        "direction": "top-bottom",
+    },
+}
+
+
+def puzzle_strands(puzzle):
+    strands = [[word, len(word)] for word in puzzle["themeWords"]]
+    strands.append(["SPANGRAM", len(puzzle["spangram"])])
+    return strands
+
+
+def fill_board(puzzle, solution):
+    columns = len(GRID[0])
+    board = [[None for _ in range(columns)] for _ in range(len(GRID))]
+    for name, path in solution.items():
+        word = puzzle["spangram"] if name == "SPANGRAM" else name
+        for index, node in enumerate(path):
+            board[(node - 1) // columns][(node - 1) % columns] = word[index]
+    return board
+
+
+def puzzle_words(puzzle):
+    words = {word: word for word in puzzle["themeWords"]}
+    words["SPANGRAM"] = puzzle["spangram"]
+    return words
+
+
+def layout_search_worker(puzzle, seed, restart_iterations, spangram_paths, engine, results):
+    # Mirrors StrandsPuzzle.solve_for_strands with a single process.
+    StrandsSolver.global_iterations = 0
+    stats = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        solution = StrandsSolver.solve_partition_restarts(puzzle_strands(puzzle), GRID, puzzle["direction"], seed, restart_iterations, stats=stats, spangram_paths=spangram_paths, words=puzzle_words(puzzle), engine=engine)
+        elapsed = time.perf_counter() - start
+    results.put((solution, elapsed, StrandsSolver.global_iterations, stats["runs"], stats["cutoffs"]))
+
+
+def run_layout_search(puzzle, seed, time_limit, restart_iterations, spangram_paths, engine="dfs"):
+    """
+    Runs one seeded layout search in a child process so it can be abandoned after
+    time_limit seconds. Returns (solution or None, seconds, dfs_extend iterations,
+    solve_partition calls, calls cut off by the restart budget); the last three are None
+    when the search timed out.
+    """
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=layout_search_worker, args=(puzzle, seed, restart_iterations, spangram_paths, engine, results))
+    start = time.perf_counter()
+    process.start()
+    try:
+        return results.get(timeout=time_limit)
+    except Exception:
+        return None, time.perf_counter() - start, None, None, None
+    finally:
+        process.terminate()
+        process.join()
+
+
+def benchmark_case(name, puzzle, wordTrie, runs, time_limit, scan_repeats, restart_iterations, spangram_library, engine="dfs"):
+    importantWords = puzzle["themeWords"] + [puzzle["spangram"]]
+    importantTrie = WordTrie()
+    for word in importantWords:
+        importantTrie.insert(word)
+
+    spangram_paths = get_spangram_paths(GRID, len(puzzle["spangram"]), puzzle["direction"], spangram_library) if spangram_library else None
+    attempts = []
+    boards = []
+    for seed in range(runs):
+        solution, elapsed, iterations, calls, cutoffs = run_layout_search(puzzle, seed, time_limit, restart_iterations, spangram_paths, engine)
+        attempt = {"seed": seed, "found": solution is not None, "seconds": elapsed, "iterations": iterations, "solvePartitionCalls": calls, "restartCutoffs": cutoffs}
+        if solution is not None:
+            board = fill_board(puzzle, solution)
+            with contextlib.redirect_stdout(io.StringIO()):
+                attempt["validBoard"] = StrandsWordFinder.analyseBoard(board, wordTrie, importantWords, importantTrie)[2]
+            boards.append(board)
+        attempts.append(attempt)
+
+    found = [attempt for attempt in attempts if attempt["found"]]
+    result = {
+        "name": name,
+        "direction": puzzle["direction"],
+        "strandLengths": sorted(len(word) for word in puzzle["themeWords"]),
+        "spangramLength": len(puzzle["spangram"]),
+        "spangramLibraryPaths": len(spangram_paths) if spangram_paths is not None else None,
+        "runs": runs,
+        "layoutSuccessRate": len(found) / runs,
+        "validBoardRate": sum(attempt["validBoard"] for attempt in found) / len(found) if found else None,
+        "meanSecondsToFirstLayout": sum(attempt["seconds"] for attempt in found) / len(found) if found else None,
+        "meanIterations": sum(attempt["iterations"] for attempt in found) / len(found) if found else None,
+        "meanSolvePartitionCalls": sum(attempt["solvePartitionCalls"] for attempt in found) / len(found) if found else None,
+        "meanRestartCutoffs": sum(attempt["restartCutoffs"] for attempt in found) / len(found) if found else None,
+        "attempts": attempts,
+    }
+
+    if boards:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for _ in range(scan_repeats):
+                for board in boards:
+                    StrandsWordFinder.calculateSetOfWords(board, wordTrie)
+            elapsed = time.perf_counter() - start
+        result["calculateSetOfWordsBoardsPerSecond"] = scan_repeats * len(boards) / elapsed
+    else:
+        result["calculateSetOfWordsBoardsPerSecond"] = None
+    return result
+
+
+def benchmark_v2_case(name, puzzle, runs):
+    """
+    Times StrandsSolverV2.calculate_strands_graph (spangram plus every theme word) over
+    seeds 0..runs-1. A seed whose search dead-ends counts as a failure.
+    """
+    direction = "vertical" if puzzle["direction"] == "top-bottom" else "horizontal"
+    with contextlib.redirect_stdout(io.StringIO()):
+        solver = StrandsSolverV2(puzzle["themeWords"], puzzle["spangram"], (len(GRID), len(GRID[0])), direction, 0)
+        found = 0
+        start = time.perf_counter()
+        for seed in range(runs):
+            solver.rng = random.Random(seed)
+            if solver.calculate_strands_graph(solver.spangramSlack, solver.spangramDirection, solver.grid_dimensions) is not None:
+                found += 1
+        elapsed = time.perf_counter() - start
+    return {"name": name, "runs": runs, "successRate": found / runs, "meanMilliseconds": 1000 * elapsed / runs}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(case_names, runs, time_limit, scan_repeats, restart_iterations, spangram_library, v2_runs=0, engine="dfs"):
+    wordTrie = get_dictionary("english_words.txt", 4, 19)
+    cases = []
+    for name in case_names:
+        print(f"Benchmarking {name}...", file=sys.stderr)
+        cases.append(benchmark_case(name, CORPUS[name], wordTrie, runs, time_limit, scan_repeats, restart_iterations, spangram_library, engine))
+    v2_cases = [benchmark_v2_case(name, CORPUS[name], v2_runs) for name in case_names] if v2_runs else []
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "runs": runs,
+        "timeLimitSeconds": time_limit,
+        "scanRepeats": scan_repeats,
+        "restartIterations": restart_iterations,
+        "spangramLibrary": spangram_library,
+        "engine": engine,
+        "cases": cases,
+        "v2Cases": v2_cases,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Strands layout generation and board scanning.")
+    parser.add_argument("--cases", nargs="+", choices=list(CORPUS), default=list(CORPUS))
+    parser.add_argument("--runs", type=int, default=5, help="Seeded layout searches per case (seeds 0..runs-1).")
+    parser.add_argument("--time-limit", type=float, default=30.0, help="Seconds before a layout search counts as failed.")
+    parser.add_argument("--scan-repeats", type=int, default=20, help="Times each found board is rescanned for throughput.")
+    parser.add_argument("--restart-iterations", type=int, default=StrandsSolver.DEFAULT_RESTART_ITERATIONS,
+                        help="Base dfs_extend budget of the Luby restart schedule (0 disables restarts).")
+    parser.add_argument("--spangram-library", default="spangram_paths.json",
+                        help="Spangram path library to sample from, if it exists (empty string searches instead).")
+    parser.add_argument("--engine", choices=StrandsSolver.ENGINES, default="dfs", help="Layout engine (dlx places every strand, spangram included, by exact cover).")
+    parser.add_argument("--v2-runs", type=int, default=0, help="Seeded StrandsSolverV2 searches per case (0 skips V2).")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout.")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.cases, args.runs, args.time_limit, args.scan_repeats, args.restart_iterations or None, args.spangram_library, args.v2_runs, args.engine)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+    else:
+        print(json.dumps(results, indent=4))
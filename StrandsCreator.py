@@ -1,5 +1,6 @@
 import random
 import json
+import sqlite3
 from datetime import datetime
 import tkinter as tk
 from tkinter import filedialog, messagebox
@@ -10,10 +11,13 @@ import networkx as nx
 import matplotlib.patches as mpatches
 import StrandsSolver
 import StrandsWordFinder
+from SpangramLibrary import get_spangram_paths
+from LayoutCache import LayoutCache
 from WordTrie import WordTrie
+from DictionaryRegistry import get_dictionary
 
 class StrandsPuzzle:
-    def __init__(self, print_date, editor):
+    def __init__(self, print_date, editor, wordTrie=None):
         self.status = "OK"
         self.id = random.randint(100, 999)
         self.print_date = print_date
@@ -31,19 +35,11 @@ class StrandsPuzzle:
         self.wordLenMax = 19
         self.wordLenMin = 4
         self.board_2d_list = []
+        self.searchStats = {}
 
-        self.wordTrie = WordTrie()
         self.reducedWordTrie = WordTrie()
-        with open("english_words.txt", "r") as file:
-            for line in file:
-                word = line.strip()
-                if not word:  # Skip empty lines.
-                    continue
-                if len(word) > self.wordLenMax:
-                    continue
-                if len(word) < self.wordLenMin:
-                    continue
-                self.wordTrie.insert(word)
+        # Shared, read-only dictionary: built (or memory-mapped) once per process.
+        self.wordTrie = wordTrie if wordTrie is not None else get_dictionary("english_words.txt", self.wordLenMin, self.wordLenMax)
 
     def add_theme_words(self, themeWords: list):
         self.themeWords = themeWords
@@ -69,7 +65,13 @@ class StrandsPuzzle:
                 return self.strandsSolution
         return None
 
-    def solve_for_strands(self, spangram_direction):
+    def solve_for_strands(self, spangram_direction, processes=1, seed=None, restart_iterations=StrandsSolver.DEFAULT_RESTART_ITERATIONS, time_limit=None, layout_cache="layout_cache.sqlite"):
+        """
+        Finds a valid layout for the puzzle's words. Layouts already found for the same
+        strand lengths are tried first from the layout_cache file (None disables it), and a
+        newly searched layout is added to it. SQLite errors from the cache are printed and
+        otherwise ignored.
+        """
         grid = [
             [1, 2, 3, 4, 5, 6],
             [7, 8, 9, 10, 11, 12],
@@ -84,16 +86,57 @@ class StrandsPuzzle:
         strands.append(["SPANGRAM", len(self.spangram)])
         print(strands)
         print(f"{sum([strand[1] for strand in strands])} letters in total")
-        while self.validate_found_solution() == False:
-            self.strandsSolution = None
-            while self.strandsSolution == None:
-                self.strandsSolution = StrandsSolver.solve_partition(strands, grid, spangram_direction)
-            self.calculate_theme_coords()
-            self.calculate_spangram_coords()
-            self.calculate_starting_board()
+        if seed is None:
+            seed = random.randrange(2**32)
+        print(f"solve_for_strands seed: {seed}")
+        words = {word: word for word in self.themeWords}
+        words["SPANGRAM"] = self.spangram
+        cache = None
+        if layout_cache is not None:
+            # The cache only saves time, so a file that cannot be opened or read (locked,
+            # read-only, corrupt) falls back to the search.
+            try:
+                cache = LayoutCache(grid, layout_cache)
+                solution = cache.lookup(words, spangram_direction, self.try_solution, random.Random(seed))
+            except sqlite3.Error as e:
+                print(f"Layout cache {layout_cache} unavailable, searching instead: {e}")
+                cache = None
+                solution = None
+            self.searchStats = {"cacheHit": solution is not None}
+            if solution is not None:
+                print("Reused a cached layout.")
+                print(self.strandsSolution)
+                return self.strandsSolution
+        # Sample the spangram from the prebuilt library when there is one for this length.
+        spangram_paths = get_spangram_paths(grid, len(self.spangram), spangram_direction)
+        # Search with the letters so layouts that trace a theme word twice are cut early.
+        if processes > 1:
+            solution = StrandsSolver.solve_partition_parallel(strands, grid, spangram_direction, processes, self.try_solution, seed, restart_iterations, time_limit, spangram_paths, words)
+        else:
+            solution = StrandsSolver.solve_partition_restarts(strands, grid, spangram_direction, seed, restart_iterations, time_limit, self.try_solution, self.searchStats, spangram_paths, words)
+            print(f"Layout search: {self.searchStats}")
+        if solution is None:
+            raise TimeoutError(f"No valid layout found within {time_limit} seconds.")
+        if cache is not None:
+            try:
+                cache.store(solution, spangram_direction)
+            except sqlite3.Error as e:
+                print(f"Could not add the layout to {layout_cache}: {e}")
         print(self.strandsSolution)
         return(self.strandsSolution)
 
+    def try_solution(self, solution):
+        """
+        Fills the board from a layout returned by the solver and reports whether it is valid.
+        """
+        self.strandsSolution = solution
+        self.calculate_theme_coords()
+        self.calculate_spangram_coords()
+        self.calculate_starting_board()
+        # Only the theme words decide validity; the full dictionary is scanned once, on the
+        # accepted board, by find_all_possible_words.
+        return self.validate_found_solution()
+
     def calculate_starting_board(self):
         startingBoardGrid = [[None for _ in range(6)] for _ in range(8)]
         for word_index, word in enumerate(self.themeWords):
@@ -139,7 +182,15 @@ class StrandsPuzzle:
     def validate_found_solution(self):
         return StrandsWordFinder.validatePuzzle(self.board_2d_list, self.reducedWordTrie, self.themeWords + [self.spangram])
     def find_all_possible_words(self):
-        self.solutions = sorted(list(StrandsWordFinder.calculateSetOfWords(self.board_2d_list, self.wordTrie)))
+        """
+        Collects every dictionary word on the board into solutions. The same scan checks the
+        theme words and the spangram again, and a board on which one of them is missing or
+        can be traced in more than one place raises ValueError.
+        """
+        allWords, _, valid = StrandsWordFinder.analyseBoard(self.board_2d_list, self.wordTrie, self.themeWords + [self.spangram], self.reducedWordTrie)
+        if not valid:
+            raise ValueError("A theme word or the spangram is missing from the board or can be traced more than once.")
+        self.solutions = sorted(list(allWords))
 
 
 def preview_puzzle_solution(puzzle: StrandsPuzzle):
@@ -221,6 +272,26 @@ def index_to_coordinates(index, num_columns):
     col = (index - 1) % num_columns
     return (row, col)
 
+def check_puzzle_inputs(theme_words, spangram, clue):
+    """
+    Returns an error message for invalid puzzle inputs, or None if they can be generated.
+    """
+    if not theme_words:
+        return "Please enter valid theme words."
+    if not spangram:
+        return "Spangram is required."
+    if not clue:
+        return "Clue is required."
+    total_letters = len(spangram) + sum(len(word) for word in theme_words)
+    if total_letters != 48:
+        return f"Total letters count is {total_letters}, but it must be 48."
+    if len(spangram) < 6:
+        return "Spangram must be at least 6 letters long."
+    for word in theme_words:
+        if len(word) < 4:
+            return "All theme words must be at least 4 letters long."
+    return None
+
 # Global variable to store the generated puzzle for previewing
 current_puzzle = None
 
@@ -251,32 +322,13 @@ def generate_json(date_entry, editor_entry, theme_entry, spangram_entry, clue_en
         messagebox.showerror("Error", "Theme words are required. Please enter a comma-separated list.")
         return
     theme_words = [word.strip().upper() for word in theme_words_raw.split(",") if word.strip()]
-    if not theme_words:
-        messagebox.showerror("Error", "Please enter valid theme words.")
-        return
-
     spangram = spangram_entry.get().upper()
-    if not spangram:
-        messagebox.showerror("Error", "Spangram is required.")
-        return
-
     clue = clue_entry.get()
-    if not clue:
-        messagebox.showerror("Error", "Clue is required.")
+    error = check_puzzle_inputs(theme_words, spangram, clue)
+    if error:
+        messagebox.showerror("Error", error)
         return
 
-    total_letters = len(spangram) + sum(len(word) for word in theme_words)
-    if total_letters != 48:
-        messagebox.showerror("Error", f"Total letters count is {total_letters}, but it must be 48.")
-        return
-    if len(spangram) < 6:
-        messagebox.showerror("Error", "Spangram must be at least 6 letters long.")
-        return
-    for word in theme_words:
-        if len(word) < 4:
-            messagebox.showerror("Error", "All theme words must be at least 4 letters long.")
-            return
-
     try:
         puzzle = StrandsPuzzle(print_date, editor_name)
         puzzle.add_theme_words(theme_words)
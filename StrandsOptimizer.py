@@ -0,0 +1,152 @@
+import argparse
+import json
+import random
+import sys
+import time
+import StrandsSolver
+from StrandsSolver import GridBitmasks, PlacedLetters, SearchBudgetExceeded, enumerate_spangram_paths, search_budget
+from SpangramLibrary import get_spangram_paths, path_diagonals, sample_spangram_path
+
+# Complete layout search that writes the file StrandsPuzzle.load_solution reads:
+#   [{"objective": <int>, "solution": {strand name: [grid nodes], ..., "SPANGRAM": [...]}}, ...]
+# best objective first. The model is the one solve_partition searches: every cell in
+# exactly one strand, each strand a path of its word's length, no two diagonal steps
+# crossing in a 2x2 square, and a spangram that touches both walls of its direction and
+# leaves two regions of at least 10 cells. Instead of random restarts, every spangram
+# path is enumerated, and the other strands are placed under each one by
+# StrandsSolver.exact_cover_solve, so with no per-spangram budget a layout that exists is
+# always found and the search ends once every spangram has been refuted.
+
+DEFAULT_SPANGRAM_ITERATIONS = 20000
+
+
+def layout_objective(solution, grid):
+    """
+    Number of turns (changes of step direction) over all strands. Higher is better: the
+    strands wind instead of running straight across the board.
+    """
+    node_to_coord = {node: (i, j) for i, row in enumerate(grid) for j, node in enumerate(row)}
+    turns = 0
+    for path in solution.values():
+        cells = [node_to_coord[node] for node in path]
+        steps = [(r2 - r1, c2 - c1) for (r1, c1), (r2, c2) in zip(cells, cells[1:])]
+        turns += sum(1 for a, b in zip(steps, steps[1:]) if a != b)
+    return turns
+
+
+def find_layouts(strands, grid, spangram_direction, max_layouts=10, time_limit=60, seed=None, spangram_iterations=DEFAULT_SPANGRAM_ITERATIONS, spangram_paths=None, words=None):
+    """
+    Returns up to max_layouts layouts (solve_partition's output shape), each under a
+    different spangram path, found within time_limit seconds. Spangrams from
+    spangram_paths (SpangramLibrary.get_spangram_paths) are tried first, then every
+    spangram path in turn, alternating with random ones. spangram_iterations bounds the
+    exact cover search under one spangram placement so that one hard refutation cannot use
+    up the time; None makes the search complete. With words, as for
+    solve_partition, the spangram is written both ways along each path and only layouts
+    on which no word can be traced twice are returned.
+    """
+    if seed is None:
+        seed = random.randrange(2**32)
+    print(f"find_layouts seed: {seed}")
+    rng = random.Random(seed)
+    masks = GridBitmasks(grid)
+    partition_cache = {}
+    spangram_length = next(length for name, length in strands if name.upper() == "SPANGRAM")
+    others = sorted([strand for strand in strands if strand[0].upper() != "SPANGRAM"], key=lambda strand: strand[1], reverse=True)
+    sorted_strands = [["SPANGRAM", spangram_length]] + others
+    theme_lengths = [length for _, length in others]
+    end = time.time() + time_limit if time_limit is not None else None
+
+    cell_masks = GridBitmasks([[r * masks.cols + c for c in range(masks.cols)] for r in range(masks.rows)])
+
+    def candidates():
+        seen = set()
+        if spangram_paths is not None:
+            library = list(spangram_paths)
+            rng.shuffle(library)
+            for nodes, _, diagonals in library:
+                seen.add(tuple(nodes))
+                yield nodes, dict(diagonals)
+        # Paths next to each other in the enumeration share most of their cells, so when
+        # one fails its neighbours usually do too; random samples in between keep the
+        # spangrams tried spread over the board.
+        for nodes, diagonals in enumerate_spangram_paths(grid, spangram_length, spangram_direction, rng):
+            sample = sample_spangram_path(masks.rows, masks.cols, spangram_length, spangram_direction, rng, cell_masks)
+            if sample is not None:
+                cells = sample[0]
+                sampled = [grid[cell // masks.cols][cell % masks.cols] for cell in cells]
+                if tuple(sampled) not in seen and tuple(sampled[::-1]) not in seen:
+                    seen.add(tuple(sampled))
+                    yield sampled, path_diagonals(cells, masks.cols)
+            if tuple(nodes) not in seen and tuple(nodes[::-1]) not in seen:
+                seen.add(tuple(nodes))
+                yield nodes, diagonals
+
+    layouts = []
+    try:
+        with search_budget(time_limit=time_limit):
+            for nodes, diagonals in candidates():
+                if not StrandsSolver.check_spangram_separation_rule(nodes, grid, None, theme_lengths, 10, masks, partition_cache):
+                    continue
+                # Without words a path and its reverse are the same placement; with words
+                # the spangram's letters run one way or the other.
+                for oriented in ([nodes, nodes[::-1]] if words is not None else [nodes]):
+                    placed_letters = PlacedLetters(masks, words) if words is not None else None
+                    solution = {"SPANGRAM": list(oriented)}
+                    if placed_letters is not None and not placed_letters.place("SPANGRAM", oriented):
+                        continue
+                    found = len(layouts)
+                    try:
+                        with search_budget(spangram_iterations):
+                            StrandsSolver.exact_cover_solve(sorted_strands, 1, masks.mask_of(oriented), dict(diagonals), solution, masks, rng, partition_cache, placed_letters,
+                                                            accept=lambda layout: layouts.append(layout) or True)
+                    except SearchBudgetExceeded:
+                        if end is not None and time.time() >= end:
+                            raise
+                    if len(layouts) > found:
+                        break
+                if len(layouts) >= max_layouts:
+                    break
+    except SearchBudgetExceeded:
+        pass
+    return layouts
+
+
+def write_layouts(file_path, layouts, grid):
+    """
+    Writes layouts as StrandsPuzzle.load_solution entries, best objective first, and
+    returns the entries.
+    """
+    entries = sorted(({"objective": layout_objective(layout, grid), "solution": layout} for layout in layouts),
+                     key=lambda entry: entry["objective"], reverse=True)
+    with open(file_path, "w") as file:
+        json.dump(entries, file, indent=4)
+    return entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search Strands layouts exhaustively and write them for StrandsPuzzle.load_solution.")
+    parser.add_argument("theme_words", help="Theme words, separated by commas.")
+    parser.add_argument("spangram")
+    parser.add_argument("--direction", choices=("left-right", "top-bottom"), default="left-right")
+    parser.add_argument("--output", default="layouts.json", help="JSON file to write.")
+    parser.add_argument("--layouts", type=int, default=10, help="Layouts to collect, one per spangram.")
+    parser.add_argument("--time-limit", type=float, default=60, help="Seconds to search for.")
+    parser.add_argument("--spangram-iterations", type=int, default=DEFAULT_SPANGRAM_ITERATIONS,
+                        help="Search budget under one spangram (0 searches each to the end, making the search complete).")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--spangram-library", default="spangram_paths.json", help="Spangram library to try first (see SpangramLibrary.py).")
+    args = parser.parse_args()
+
+    grid = [[row * 6 + col + 1 for col in range(6)] for row in range(8)]
+    theme_words = [word.strip().upper() for word in args.theme_words.split(",") if word.strip()]
+    spangram = args.spangram.strip().upper()
+    strands = [[word, len(word)] for word in theme_words] + [["SPANGRAM", len(spangram)]]
+    words = {word: word for word in theme_words}
+    words["SPANGRAM"] = spangram
+    start = time.time()
+    layouts = find_layouts(strands, grid, args.direction, args.layouts, args.time_limit, args.seed, args.spangram_iterations or None,
+                           get_spangram_paths(grid, len(spangram), args.direction, args.spangram_library), words)
+    entries = write_layouts(args.output, layouts, grid)
+    print(f"Wrote {len(entries)} layouts to {args.output} in {time.time() - start:.1f}s; objectives {[entry['objective'] for entry in entries]}", file=sys.stderr)
+    sys.exit(0 if entries else 1)
@@ -0,0 +1,356 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import sys
+import time
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+from StrandsCreator import StrandsPuzzle, check_puzzle_inputs
+
+# Local HTTP service for the web front end (JavaScriptIntegration.js):
+#   POST generate                 form fields spangram, w0..wN, theme (the clue), and the
+#                                 optional editor and direction; answers {"job", "status"}
+#                                 at once and queues the layout search
+#   GET  generate/<job>           the job's status; a finished job also carries the
+#                                 spangram, spangramloc, words and loc fields the page fills
+#                                 the board from
+#   GET  generate/<job>/events    the same status as server-sent events, one per change,
+#                                 until the job finishes or fails
+#   POST url_check                JSON {"val": url}; answers {"exists"}, whether
+#                                 <output dir>/<url>.json is already taken
+# Searches run in a process pool so a long Strands search never holds up a request.
+# Queued jobs are grouped by editor and started round-robin, so one editor submitting
+# many puzzles cannot keep everyone else waiting.
+
+MAX_BODY = 64 * 1024
+# Finished jobs are forgotten this many seconds after they end.
+JOB_RETENTION = 3600
+URL_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def generate_layout(theme_words, spangram, clue, direction, editor, seed, time_limit):
+    """
+    Runs in a worker process: the same layout search and board validation as
+    StrandsPuzzle.solve_for_strands, returned in the page's serialised form. Cells are
+    numbered row * 6 + col, and words/loc list the theme words and their cells in order,
+    separated by "|".
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        puzzle = StrandsPuzzle(datetime.now(), editor)
+        puzzle.add_theme_words(theme_words)
+        puzzle.add_spangram(spangram)
+        puzzle.add_clue(clue)
+        solution = puzzle.solve_for_strands(direction, seed=seed, time_limit=time_limit)
+    return {
+        "spangram": spangram,
+        "spangramloc": "|".join(str(node - 1) for node in solution["SPANGRAM"]),
+        "words": "|".join(theme_words),
+        "loc": "|".join(str(node - 1) for word in theme_words for node in solution[word]),
+        "seed": seed,
+        "searchStats": puzzle.searchStats,
+    }
+
+
+def parse_generate_form(form, default_editor, peer):
+    """
+    Reads a generate request the way StrandsBatch.parse_row reads a row. Jobs from a
+    request without an editor are queued under the client's address.
+    """
+    def field(name, default=""):
+        value = form.get(name, default)
+        if not isinstance(value, str):
+            raise ValueError(f"Field '{name}' must be a string.")
+        return value.strip()
+
+    word_fields = sorted((name for name in form if re.fullmatch(r"w\d+", name)), key=lambda name: int(name[1:]))
+    theme_words = [field(name).upper() for name in word_fields if field(name)]
+    spangram = field("spangram").upper()
+    clue = field("theme")
+    direction = field("direction", "left-right")
+    editor = field("editor") or default_editor or peer
+
+    error = check_puzzle_inputs(theme_words, spangram, clue)
+    if error is None and direction not in ("left-right", "top-bottom"):
+        error = f"Invalid direction '{direction}'. Use 'left-right' or 'top-bottom'."
+    if error is not None:
+        raise ValueError(error)
+    return theme_words, spangram, clue, direction, editor
+
+
+class Job:
+    def __init__(self, editor, args):
+        self.id = uuid.uuid4().hex
+        self.editor = editor
+        self.args = args
+        self.status = "queued"
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        # Bumped on every status change; event streams wait on changed for a new version.
+        self.version = 0
+        self.changed = asyncio.Condition()
+
+    def to_dict(self, position=None):
+        data = {"job": self.id, "status": self.status, "editor": self.editor}
+        if position is not None:
+            data["position"] = position
+        if self.started is not None:
+            data["queuedSeconds"] = self.started - self.created
+        if self.finished is not None:
+            data["runSeconds"] = self.finished - self.started
+        if self.result is not None:
+            data.update(self.result)
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+    async def set_status(self, status):
+        self.status = status
+        if status == "running":
+            self.started = time.time()
+        elif status in ("done", "failed"):
+            self.finished = time.time()
+        async with self.changed:
+            self.version += 1
+            self.changed.notify_all()
+
+
+class JobScheduler:
+    """
+    Queues generate jobs per editor and runs them on a ProcessPoolExecutor, starting the
+    next job from the next editor in turn whenever a worker is free.
+    """
+    def __init__(self, processes, time_limit, max_queued_per_editor=10):
+        self.processes = processes
+        self.time_limit = time_limit
+        self.max_queued_per_editor = max_queued_per_editor
+        self.jobs = {}
+        self.queues = {}
+        self.turns = deque()
+        self.ready = asyncio.Semaphore(0)
+        self.executor = None
+        self.runners = []
+
+    def start(self):
+        self.executor = ProcessPoolExecutor(self.processes)
+        self.runners = [asyncio.create_task(self.run_jobs()) for _ in range(self.processes)]
+
+    async def stop(self):
+        for runner in self.runners:
+            runner.cancel()
+        await asyncio.gather(*self.runners, return_exceptions=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, editor, args):
+        self.forget_finished()
+        queue = self.queues.setdefault(editor, deque())
+        if len(queue) >= self.max_queued_per_editor:
+            raise ValueError(f"{editor} already has {len(queue)} puzzles queued.")
+        if not queue:
+            self.turns.append(editor)
+        job = Job(editor, args)
+        queue.append(job)
+        self.jobs[job.id] = job
+        self.ready.release()
+        return job
+
+    def position(self, job):
+        """
+        How many queued jobs start before this one under the round-robin order.
+        """
+        if job.status != "queued":
+            return None
+        index = self.queues[job.editor].index(job)
+        ahead = 0
+        for editor in self.turns:
+            queue = self.queues[editor]
+            if editor == job.editor:
+                ahead += index
+            else:
+                # An editor ahead in the turn order gets index + 1 turns before this job,
+                # one behind gets index turns.
+                turns_first = index + 1 if self.turns.index(editor) < self.turns.index(job.editor) else index
+                ahead += min(len(queue), turns_first)
+        return ahead
+
+    def next_job(self):
+        editor = self.turns.popleft()
+        queue = self.queues[editor]
+        job = queue.popleft()
+        if queue:
+            self.turns.append(editor)
+        else:
+            del self.queues[editor]
+        return job
+
+    async def run_jobs(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.ready.acquire()
+            job = self.next_job()
+            await job.set_status("running")
+            try:
+                job.result = await loop.run_in_executor(self.executor, generate_layout, *job.args, random.randrange(2**32), self.time_limit)
+                await job.set_status("done")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.error = str(e) or type(e).__name__
+                await job.set_status("failed")
+
+    def forget_finished(self):
+        cutoff = time.time() - JOB_RETENTION
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished is not None and job.finished < cutoff]:
+            del self.jobs[job_id]
+
+
+class StrandsServer:
+    def __init__(self, scheduler, output_dir=".", default_editor=None):
+        self.scheduler = scheduler
+        self.output_dir = output_dir
+        self.default_editor = default_editor
+
+    async def handle_connection(self, reader, writer):
+        try:
+            request = await read_request(reader)
+            if request is not None:
+                await self.route(writer, *request)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:
+            await send_json(writer, 400, {"error": str(e)})
+        except Exception:
+            traceback.print_exc()
+            with contextlib.suppress(ConnectionError):
+                await send_json(writer, 500, {"error": "Internal server error."})
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def route(self, writer, method, path, body):
+        parts = [part for part in urlsplit(path).path.split("/") if part]
+        peer = writer.get_extra_info("peername")
+        peer = peer[0] if peer else "unknown"
+        if parts == ["generate"] and method == "POST":
+            theme_words, spangram, clue, direction, editor = parse_generate_form(parse_body(body), self.default_editor, peer)
+            job = self.scheduler.submit(editor, (theme_words, spangram, clue, direction, editor))
+            await send_json(writer, 202, job.to_dict(self.scheduler.position(job)))
+        elif len(parts) in (2, 3) and parts[0] == "generate" and method == "GET":
+            job = self.scheduler.jobs.get(parts[1])
+            if job is None:
+                await send_json(writer, 404, {"error": f"No job {parts[1]}."})
+            elif len(parts) == 2:
+                await send_json(writer, 200, job.to_dict(self.scheduler.position(job)))
+            elif parts[2] == "events":
+                await self.stream_job(writer, job)
+            else:
+                await send_json(writer, 404, {"error": f"Unknown path {path}."})
+        elif parts == ["url_check"] and method == "POST":
+            url = str(parse_body(body).get("val", "")).strip()
+            if not URL_PATTERN.match(url):
+                raise ValueError("Urls may only contain letters, digits, '-' and '_'.")
+            await send_json(writer, 200, {"exists": os.path.exists(os.path.join(self.output_dir, f"{url}.json"))})
+        else:
+            await send_json(writer, 404, {"error": f"Unknown path {path}."})
+
+    async def stream_job(self, writer, job):
+        """
+        Sends the job's status as a server-sent event now and after every change, and
+        closes the stream once the job is done or failed.
+        """
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        seen = -1
+        while True:
+            async with job.changed:
+                # Time out now and then so queue positions stay current while waiting.
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(job.changed.wait_for(lambda: job.version != seen), timeout=5)
+                seen = job.version
+            writer.write(f"data: {json.dumps(job.to_dict(self.scheduler.position(job)))}\n\n".encode())
+            await writer.drain()
+            if job.status in ("done", "failed"):
+                return
+
+
+async def read_request(reader):
+    """
+    Reads one HTTP/1.1 request. Returns (method, path, body bytes), or None if the client
+    closed the connection without sending one.
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ValueError("Malformed request line.")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0) or 0)
+    if length > MAX_BODY:
+        raise ValueError("Request body too large.")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, body
+
+
+def parse_body(body):
+    """
+    The page sends url_check a JSON body labelled as form data, so JSON is tried first.
+    """
+    text = body.decode("utf-8", errors="replace").strip()
+    if text.startswith("{"):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            raise ValueError("Malformed JSON body.")
+    return {name: values[-1] for name, values in parse_qs(text).items()}
+
+
+async def send_json(writer, status, data):
+    reasons = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+    body = json.dumps(data).encode()
+    writer.write(f"HTTP/1.1 {status} {reasons[status]}\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+    await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8000, processes=1, time_limit=300, output_dir=".", default_editor=None):
+    scheduler = JobScheduler(processes, time_limit)
+    scheduler.start()
+    app = StrandsServer(scheduler, output_dir, default_editor)
+    server = await asyncio.start_server(app.handle_connection, host, port)
+    print(f"Serving on http://{host}:{port} with {processes} worker(s).", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await scheduler.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Strands layout generation for the web front end.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Layout searches run at once.")
+    parser.add_argument("--time-limit", type=float, default=300, help="Seconds allowed for each layout search.")
+    parser.add_argument("--output-dir", default=".", help="Directory whose <url>.json files url_check looks for.")
+    parser.add_argument("--editor", help="Editor name for requests without one.")
+    args = parser.parse_args()
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(serve(args.host, args.port, args.processes, args.time_limit, args.output_dir, args.editor))
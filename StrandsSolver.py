@@ -1,27 +1,93 @@
+import os
 import random
 import time
+import multiprocessing
+import queue
 from collections import deque
+from contextlib import contextmanager
 import networkx as nx
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
+import SearchMetrics
+from StrandsWordFinder import getNeighbourTable
 
-# Global counter for monitoring progress.
+# Global counter for monitoring progress. solve_partition resets start_time and
+# start_iterations so the progress line reports on the current search only.
 global_iterations = 0
 start_time = time.time()
+start_iterations = 0
+
+# Budget of the running solve_partition call, checked in dfs_extend. Set only by
+# solve_partition; None means unlimited.
+iteration_limit = None
+deadline = None
+
+# Base number of dfs_extend iterations for one solve_partition run under
+# solve_partition_restarts; run i gets this times luby(i).
+DEFAULT_RESTART_ITERATIONS = 5000
+
+class SearchBudgetExceeded(Exception):
+    """
+    Raised from dfs_extend when the running solve_partition call has used up its budget.
+    """
 
 # ---------------------
 # DFS/backtracking functions
 # ---------------------
 
-def dfs_extend(path, used, target_length, node_to_coord, grid, prev_direction, prefer_turn, diagonals_used):
-    global global_iterations, start_time
+@contextmanager
+def search_budget(max_iterations=None, time_limit=None):
+    """
+    Gives the search run in the with block max_iterations more count_iteration calls and
+    time_limit seconds, after which count_iteration raises SearchBudgetExceeded. Also
+    restarts the progress line's clock and iteration count. Budgets nest: an inner one
+    never outlasts the one around it, which is back in force after the inner block.
+    """
+    global iteration_limit, deadline, start_time, start_iterations
+    previous = (iteration_limit, deadline)
+    start_time = time.time()
+    start_iterations = global_iterations
+    if max_iterations is not None:
+        iteration_limit = min(global_iterations + max_iterations, iteration_limit if iteration_limit is not None else float("inf"))
+    if time_limit is not None:
+        deadline = min(start_time + time_limit, deadline if deadline is not None else float("inf"))
+    try:
+        yield
+    finally:
+        iteration_limit, deadline = previous
+
+def count_iteration():
+    """
+    Counts one search step (a dfs_extend call or an exact cover path step) against the
+    running solve_partition call's budget.
+    """
+    global global_iterations
     global_iterations += 1
-    if global_iterations % 1000000 == 0:
+    if (global_iterations - start_iterations) % 1000000 == 0:
         elapsed = time.time() - start_time
-        print(f"[PID {time.process_time()}] Iterations: {global_iterations}, Elapsed: {elapsed:.2f}s")
+        print(f"[PID {os.getpid()}] Iterations: {global_iterations - start_iterations}, Elapsed: {elapsed:.2f}s")
+    if iteration_limit is not None and global_iterations > iteration_limit:
+        raise SearchBudgetExceeded()
+    if deadline is not None and global_iterations % 1000 == 0 and time.time() > deadline:
+        raise SearchBudgetExceeded()
+
+def dfs_extend(path, used, target_length, node_to_coord, grid, prev_direction, prefer_turn, diagonals_used, rng=random, masks=None, used_mask=0, min_pocket=None):
+    """
+    When min_pocket is given, masks and used_mask (the nodes in `used` as a GridBitmasks
+    mask) must be too. The walk is then checked after every step with dead_cells_left and
+    backtracks one step as soon as a step strands free cells: whatever this prefix goes on
+    to do, the finished path would only be thrown away by the lookahead in
+    backtrack_solve. Shorter prefixes of the same walk are still tried.
+    """
+    count_iteration()
     
     if len(path) == target_length:
         return list(path)
+
+    if min_pocket is not None and dead_cells_left(masks, used_mask, masks.node_to_bit[path[-1]], target_length - len(path), min_pocket):
+        if SearchMetrics.active is not None:
+            SearchMetrics.active.count("prune.dead_cells")
+        return None
     
     current = path[-1]
     grid_rows = len(grid)
@@ -48,11 +114,11 @@ def dfs_extend(path, used, target_length, node_to_coord, grid, prev_direction, p
                 straight.append((neighbor, direction))
             else:
                 turning.append((neighbor, direction))
-        random.shuffle(turning)
-        random.shuffle(straight)
+        rng.shuffle(turning)
+        rng.shuffle(straight)
         neighbors = turning + straight
     else:
-        random.shuffle(neighbors)
+        rng.shuffle(neighbors)
     
     for neighbor, direction in neighbors:
         is_diagonal = (abs(direction[0]) == 1 and abs(direction[1]) == 1)
@@ -77,6 +143,8 @@ def dfs_extend(path, used, target_length, node_to_coord, grid, prev_direction, p
                         diag_type = 2
                 # Enforce diagonal constraint.
                 if square_key in diagonals_used and diagonals_used[square_key] != diag_type:
+                    if SearchMetrics.active is not None:
+                        SearchMetrics.active.count("prune.diagonal_crossing")
                     continue
                 if square_key not in diagonals_used:
                     diagonals_used[square_key] = diag_type
@@ -85,8 +153,8 @@ def dfs_extend(path, used, target_length, node_to_coord, grid, prev_direction, p
         # Extend the path.
         path.append(neighbor)
         used.add(neighbor)
-        result = dfs_extend(path, used, target_length, node_to_coord, grid, direction, prefer_turn, diagonals_used)
-        if result is not None:
+        result = dfs_extend(path, used, target_length, node_to_coord, grid, direction, prefer_turn, diagonals_used, rng, masks, used_mask | masks.node_to_bit[neighbor] if masks else 0, min_pocket)
+        if result:
             return result
         # Backtrack.
         path.pop()
@@ -95,12 +163,15 @@ def dfs_extend(path, used, target_length, node_to_coord, grid, prev_direction, p
             del diagonals_used[square_key]
     return None
 
-def dfs_for_strand(strand_name, strand_length, start_node, used, node_to_coord, grid, prefer_turn, diagonals_used):
+def dfs_for_strand(strand_name, strand_length, start_node, used, node_to_coord, grid, prefer_turn, diagonals_used, rng=random, masks=None, used_mask=0, min_pocket=None):
     path = [start_node]
     used.add(start_node)
-    result = dfs_extend(path, used, strand_length, node_to_coord, grid, None, prefer_turn, diagonals_used)
-    if result is None:
+    if masks is not None:
+        used_mask |= masks.node_to_bit[start_node]
+    result = dfs_extend(path, used, strand_length, node_to_coord, grid, None, prefer_turn, diagonals_used, rng, masks, used_mask, min_pocket)
+    if not result:
         used.remove(start_node)
+        return None
     return result
 
 def check_spangram_constraint(path, grid, spangram_direction):
@@ -121,41 +192,179 @@ def check_spangram_constraint(path, grid, spangram_direction):
     else:
         raise ValueError("Invalid spangram_direction. Use 'left-right' or 'top-bottom'.")
 
+# ---------------------
+# Bitmask connectivity
+# ---------------------
+
+class GridBitmasks:
+    """
+    Represents sets of grid nodes as integers: the node at (row, col) is bit row * cols + col.
+    Connected components of free cells are found by repeatedly growing a mask by one king
+    move with shifts, which costs a handful of integer operations per step instead of a
+    flood fill over Python sets.
+    """
+    def __init__(self, grid):
+        self.rows = len(grid)
+        self.cols = len(grid[0])
+        self.full = (1 << (self.rows * self.cols)) - 1
+        self.node_to_bit = {}
+        first_col = 0
+        last_col = 0
+        for i, row in enumerate(grid):
+            for j, node in enumerate(row):
+                self.node_to_bit[node] = 1 << (i * self.cols + j)
+            first_col |= 1 << (i * self.cols)
+            last_col |= 1 << (i * self.cols + self.cols - 1)
+        # A shift by one column must not wrap a cell onto the neighbouring row.
+        self.not_first_col = self.full & ~first_col
+        self.not_last_col = self.full & ~last_col
+
+    def mask_of(self, nodes):
+        mask = 0
+        for node in nodes:
+            mask |= self.node_to_bit[node]
+        return mask
+
+    def grow(self, mask):
+        """
+        Returns mask plus every cell one king move away from it.
+        """
+        row = mask | ((mask << 1) & self.not_first_col) | ((mask >> 1) & self.not_last_col)
+        return (row | (row << self.cols) | (row >> self.cols)) & self.full
+
+    def components(self, free_mask):
+        components = []
+        while free_mask:
+            component = free_mask & -free_mask
+            while True:
+                grown = self.grow(component) & free_mask
+                if grown == component:
+                    break
+                component = grown
+            components.append(component)
+            free_mask &= ~component
+        return components
+
+    def component_sizes(self, free_mask):
+        return [component.bit_count() for component in self.components(free_mask)]
+
+def dead_cells_left(masks, used_mask, head_bit, cells_left, min_pocket):
+    """
+    In-path check for a strand that still needs cells_left more cells after head_bit.
+    Returns True when no free region touching the head has room for the rest of the strand,
+    or when free cells are stranded: a region smaller than min_pocket (the shortest strand
+    still to be placed) that this strand cannot finish inside.
+    """
+    free_mask = masks.full & ~used_mask
+    head_neighbours = masks.grow(head_bit)
+    # Stepping onto the head can only split a region if its free neighbours are not already
+    # connected to each other around it, so most steps skip the full component scan.
+    free_neighbours = head_neighbours & free_mask
+    if not free_neighbours:
+        return True
+    if len(masks.components(free_neighbours)) == 1:
+        return False
+    head_regions = []
+    stranded = []
+    for component in masks.components(free_mask):
+        size = component.bit_count()
+        if component & head_neighbours and size >= cells_left:
+            head_regions.append(component)
+        if size < min_pocket:
+            stranded.append(component)
+    if not head_regions:
+        return True
+    # The strand finishes inside one head region, so it can absorb at most one small region.
+    return len(stranded) > 1 or (len(stranded) == 1 and stranded[0] not in head_regions)
+
+class PlacedLetters:
+    """
+    The letters of the strands placed so far, for a search that knows its words. A word
+    traced over placed cells can never be traced differently once the board is full, so a
+    placement that lets any theme word or the spangram be traced over cells other than its
+    own (in any order) makes the finished board ambiguous, whatever goes in the free cells.
+    words maps strand names to their letters.
+    """
+    def __init__(self, masks, words):
+        self.masks = masks
+        self.words = words
+        self.neighbours = getNeighbourTable(masks.rows, masks.cols)
+        self.letters = [None] * (masks.rows * masks.cols)
+        self.word_masks = {}
+        # letter -> every (word, index) where the word has that letter.
+        self.letter_positions = {}
+        for word in set(words.values()):
+            for index, letter in enumerate(word):
+                self.letter_positions.setdefault(letter, []).append((word, index))
+
+    def place(self, name, path):
+        """
+        Writes the strand's letters and returns False if that lets a word be traced through
+        one of its cells anywhere but on the word's own cells. The strand stays placed
+        either way; undo it with remove.
+        """
+        word = self.words[name]
+        path_mask = 0
+        for node, letter in zip(path, word):
+            bit = self.masks.node_to_bit[node]
+            self.letters[bit.bit_length() - 1] = letter
+            path_mask |= bit
+        self.word_masks[word] = path_mask
+        return not self.alternate_trace(path_mask)
+
+    def remove(self, name, path):
+        for node in path:
+            self.letters[self.masks.node_to_bit[node].bit_length() - 1] = None
+        del self.word_masks[self.words[name]]
+
+    def alternate_trace(self, new_mask):
+        """
+        True if a word traces over placed cells, through at least one cell of new_mask,
+        onto a set of cells that is not its own placement. Every earlier trace was already
+        checked when its own cells were placed, so traces are only grown outward from the
+        new cells: from each one, for each place its letter has in a word, the rest of the
+        word forwards and then the start of it backwards. A trace through several new cells
+        is only followed from the first of them.
+        """
+        letters = self.letters
+        neighbours = self.neighbours
+        word_masks = self.word_masks
+        done = 0
+
+        def match(word, index, step, cell, visited, anchor, anchor_index):
+            index += step
+            if index == len(word):
+                return match(word, anchor_index, -1, anchor, visited, anchor, anchor_index)
+            if index < 0:
+                return word_masks.get(word) != visited
+            letter = word[index]
+            for neighbour in neighbours[cell]:
+                if letters[neighbour] == letter and not ((visited | done) >> neighbour) & 1 and match(word, index, step, neighbour, visited | (1 << neighbour), anchor, anchor_index):
+                    return True
+            return False
+
+        while new_mask:
+            bit = new_mask & -new_mask
+            new_mask ^= bit
+            cell = bit.bit_length() - 1
+            for word, index in self.letter_positions.get(letters[cell], ()):
+                if match(word, index, 1, cell, bit, cell, index):
+                    return True
+            done |= bit
+        return False
+
 # ---------------------
 # New function: additional spangram separation check
 # ---------------------
-def check_spangram_separation_rule(path, grid, node_to_coord, remaining_strands, min_free=10):
+def check_spangram_separation_rule(path, grid, node_to_coord, remaining_strands, min_free=10, masks=None, partition_cache=None):
     """
     After placing the spangram, ensure that removing its nodes splits the grid into exactly two 
     connected free regions, each with at least min_free nodes, and that the free regions can be 
     exactly filled by some combination of the remaining strands.
     """
-    used = set(path)
-    all_nodes = set(node for row in grid for node in row)
-    free_nodes = all_nodes - used
-    free_components = []
-    visited = set()
-    directions = [(-1, 0), (-1, 1), (0, 1), (1, 1),
-                  (1, 0), (1, -1), (0, -1), (-1, -1)]
-    for node in free_nodes:
-        if node in visited:
-            continue
-        comp_size = 0
-        stack = [node]
-        while stack:
-            cur = stack.pop()
-            if cur in visited:
-                continue
-            visited.add(cur)
-            comp_size += 1
-            r, c = node_to_coord[cur]
-            for dr, dc in directions:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < len(grid) and 0 <= nc < len(grid[0]):
-                    neighbor = grid[nr][nc]
-                    if neighbor in free_nodes and neighbor not in visited:
-                        stack.append(neighbor)
-        free_components.append(comp_size)
+    if masks is None:
+        masks = GridBitmasks(grid)
+    free_components = masks.component_sizes(masks.full & ~masks.mask_of(path))
     # The spangram must split the grid into exactly two free regions.
     if len(free_components) != 2:
         return False
@@ -163,7 +372,7 @@ def check_spangram_separation_rule(path, grid, node_to_coord, remaining_strands,
     if any(comp_size < min_free for comp_size in free_components):
         return False
     # Ensure that the free regions can be exactly filled by the remaining strands.
-    if not can_partition_components(free_components, remaining_strands):
+    if not can_partition_components(free_components, remaining_strands, partition_cache):
         return False
     return True
 
@@ -171,109 +380,449 @@ def check_spangram_separation_rule(path, grid, node_to_coord, remaining_strands,
 # Connectivity and feasibility checks
 # ---------------------
 
-def get_free_components(used, grid, node_to_coord):
-    all_nodes = set(node for row in grid for node in row)
-    free_nodes = all_nodes - used
-    components = []
-    visited = set()
-    directions = [(-1, 0), (-1, 1), (0, 1), (1, 1),
-                  (1, 0), (1, -1), (0, -1), (-1, -1)]
-    for node in free_nodes:
-        if node in visited:
-            continue
-        comp_size = 0
-        stack = [node]
-        while stack:
-            cur = stack.pop()
-            if cur in visited:
-                continue
-            visited.add(cur)
-            comp_size += 1
-            r, c = node_to_coord[cur]
-            for dr, dc in directions:
-                nr, nc = r + dr, c + dc
-                if 0 <= nr < len(grid) and 0 <= nc < len(grid[0]):
-                    neighbor = grid[nr][nc]
-                    if neighbor in free_nodes and neighbor not in visited:
-                        stack.append(neighbor)
-        components.append(comp_size)
-    return components
-
-def can_partition_components(component_sizes, strands):
-    if not component_sizes:
-        return len(strands) == 0
-    component_sizes = sorted(component_sizes, reverse=True)
-    target = component_sizes[0]
-    
-    subsets = []
-    def find_subsets(i, current, current_sum):
-        if current_sum == target:
-            subsets.append(current[:])
-            return
-        if i >= len(strands) or current_sum > target:
+def get_free_components(used, grid, node_to_coord, masks=None):
+    if masks is None:
+        masks = GridBitmasks(grid)
+    return masks.component_sizes(masks.full & ~masks.mask_of(used))
+
+def can_partition_components(component_sizes, strands, cache=None):
+    """
+    True if the strand lengths can be split into groups whose sums are exactly the
+    component sizes. Answers are memoised in cache (a dict, reusable across calls) keyed on
+    the sorted size and length tuples, since the same multisets recur throughout a search.
+    """
+    components = tuple(sorted(component_sizes, reverse=True))
+    lengths = tuple(sorted(strands, reverse=True))
+    if cache is None:
+        cache = {}
+    if SearchMetrics.active is not None:
+        SearchMetrics.active.count("partition_check.calls")
+        if (components, lengths) in cache:
+            SearchMetrics.active.count("partition_check.cache_hits")
+    return partition_feasible(components, lengths, cache)
+
+def partition_feasible(components, lengths, cache):
+    key = (components, lengths)
+    if key in cache:
+        return cache[key]
+    if not components:
+        result = not lengths
+    elif sum(components) != sum(lengths):
+        result = False
+    else:
+        # Fill the largest component with each distinct sub-multiset of lengths that sums to
+        # it, then solve the rest. Skipping equal lengths at the same depth avoids trying the
+        # same multiset twice.
+        target = components[0]
+        result = False
+        chosen = []
+        def fill(start, remaining):
+            nonlocal result
+            if remaining == 0:
+                rest = list(lengths)
+                for index in chosen:
+                    rest[index] = None
+                if partition_feasible(components[1:], tuple(length for length in rest if length is not None), cache):
+                    result = True
+                return
+            previous = None
+            for i in range(start, len(lengths)):
+                if result:
+                    return
+                if lengths[i] > remaining or lengths[i] == previous:
+                    continue
+                previous = lengths[i]
+                chosen.append(i)
+                fill(i + 1, remaining - lengths[i])
+                chosen.pop()
+        fill(0, target)
+    cache[key] = result
+    return result
+
+# ---------------------
+# Exact cover engine: Algorithm X over the cells left after the spangram
+# ---------------------
+
+ENGINES = ("dfs", "dlx")
+
+def diagonal_of(a, b, cols):
+    """
+    Returns (square_key, diag_type) for a diagonal step between cells a and b, matching
+    the keys dfs_extend stores in diagonals_used, or None for a straight step.
+    """
+    (r1, c1), (r2, c2) = divmod(a, cols), divmod(b, cols)
+    if r1 == r2 or c1 == c2:
+        return None
+    square_key = (min(r1, r2), min(c1, c2))
+    # Type 1 runs through the square's top-left corner, type 2 through its top-right.
+    diag_type = 1 if (r1 - r2) == (c1 - c2) else 2
+    return square_key, diag_type
+
+# Diagonal step tables are cached per grid shape: steps[a][b] is diagonal_of(a, b, cols).
+diagonalStepTables = {}
+
+def get_diagonal_steps(rows, cols):
+    key = (rows, cols)
+    if key not in diagonalStepTables:
+        diagonalStepTables[key] = [{neighbour: diagonal_of(cell, neighbour, cols) for neighbour in cell_neighbours}
+                                   for cell, cell_neighbours in enumerate(getNeighbourTable(rows, cols))]
+    return diagonalStepTables[key]
+
+def paths_through(cell, length, free_mask, diagonals_used, neighbours, steps, rng=random):
+    """
+    Yields every path of length free cells that contains cell, once each (in one of its two
+    directions), as lists of cell numbers. The path is built as two arms walked out from
+    cell; while a path is being yielded its diagonal steps are claimed in diagonals_used,
+    and steps that would cross a claimed diagonal are never taken.
+    """
+    first = [cell]
+    second = []
+
+    def arm(cells, head, visited, cells_left):
+        if cells_left == 0:
+            yield visited
             return
-        current.append(i)
-        find_subsets(i+1, current, current_sum + strands[i])
-        current.pop()
-        find_subsets(i+1, current, current_sum)
-    find_subsets(0, [], 0)
-    if not subsets:
+        options = list(neighbours[head])
+        rng.shuffle(options)
+        for neighbour in options:
+            if not (free_mask >> neighbour) & 1 or (visited >> neighbour) & 1:
+                continue
+            count_iteration()
+            step = steps[head][neighbour]
+            claimed = False
+            if step is not None:
+                square_key, diag_type = step
+                if diagonals_used.get(square_key, diag_type) != diag_type:
+                    continue
+                if square_key not in diagonals_used:
+                    diagonals_used[square_key] = diag_type
+                    claimed = True
+            cells.append(neighbour)
+            yield from arm(cells, neighbour, visited | (1 << neighbour), cells_left - 1)
+            cells.pop()
+            if claimed:
+                del diagonals_used[square_key]
+
+    # The first arm is the longer one, so each path turns up from only one of its ends; arms
+    # of equal length are told apart by their first cells.
+    for first_cells in range(length - 1, (length - 2) // 2, -1):
+        second_cells = length - 1 - first_cells
+        for visited in arm(first, cell, 1 << cell, first_cells):
+            for _ in arm(second, cell, visited, second_cells):
+                if first_cells > second_cells or second_cells == 0 or first[1] < second[0]:
+                    yield first[::-1] + second
+
+def enumerate_spangram_paths(grid, length, spangram_direction, rng=random):
+    """
+    Yields (nodes, diagonals) for every path of length cells that touches both walls of
+    spangram_direction, once each, with the diagonals dict it claims. A path is produced
+    from the first of its cells on the top (or left) wall; those cells take turns, so the
+    order is spread over the whole wall instead of exhausting one corner first.
+    """
+    masks = GridBitmasks(grid)
+    rows, cols = masks.rows, masks.cols
+    neighbours = getNeighbourTable(rows, cols)
+    steps = get_diagonal_steps(rows, cols)
+    if spangram_direction == "top-bottom":
+        low_wall = [cell for cell in range(rows * cols) if cell // cols == 0]
+        high_wall = {cell for cell in range(rows * cols) if cell // cols == rows - 1}
+    else:
+        low_wall = [cell for cell in range(rows * cols) if cell % cols == 0]
+        high_wall = {cell for cell in range(rows * cols) if cell % cols == cols - 1}
+    low_order = {cell: index for index, cell in enumerate(low_wall)}
+    rng.shuffle(low_wall)
+
+    def from_start(start):
+        diagonals = {}
+        for path in paths_through(start, length, masks.full, diagonals, neighbours, steps, rng):
+            first_low = min((cell for cell in path if cell in low_order), key=low_order.get)
+            if first_low == start and any(cell in high_wall for cell in path):
+                yield [grid[cell // cols][cell % cols] for cell in path], dict(diagonals)
+            else:
+                yield None
+
+    walkers = [from_start(start) for start in low_wall]
+    while walkers:
+        for walker in list(walkers):
+            try:
+                item = next(walker)
+            except StopIteration:
+                walkers.remove(walker)
+                continue
+            if item is not None:
+                yield item
+
+def exact_cover_solve(sorted_strands, index, used_mask, diagonals_used, solution, masks, rng=random, partition_cache=None, placed_letters=None, accept=None):
+    """
+    Places sorted_strands[index:] by Algorithm X with the free cells as primary items (each
+    covered exactly once) and the 2x2 squares as secondary items (at most one diagonal step
+    each, which is the no-crossing rule). There are far too many rows to list up front
+    (several hundred thousand 8-cell paths in a 30-cell region), so they are generated for
+    one item at a time: the free cell with the fewest free neighbours is chosen, and the
+    search branches on every path through it for every strand length still needed, after
+    the same connectivity lookahead as backtrack_solve. Unlike the random walk, which keeps
+    only the first path from each start, every row is tried, so a layout that exists is
+    found and one that does not is refuted.
+    With placed_letters, every free strand of the length and both directions of the path
+    are tried, and strands that let a placed word be traced twice are cut.
+    Each complete cover is passed to accept (if given), and the search goes on to the next
+    one while accept returns False.
+    """
+    if partition_cache is None:
+        partition_cache = {}
+    metrics = SearchMetrics.active
+    neighbours = getNeighbourTable(masks.rows, masks.cols)
+    steps = get_diagonal_steps(masks.rows, masks.cols)
+    cell_nodes = [None] * (masks.rows * masks.cols)
+    for node, bit in masks.node_to_bit.items():
+        cell_nodes[bit.bit_length() - 1] = node
+    names_left = [name for name, _ in sorted_strands[index:]]
+    lengths = dict(sorted_strands[index:])
+
+    def cover(free_mask):
+        if not names_left:
+            return accept is None or accept(dict(solution))
+        if metrics is not None:
+            metrics.count("exact_cover.nodes")
+        remaining_lengths = [lengths[name] for name in names_left]
+        free_components = masks.component_sizes(free_mask)
+        if min(free_components) < min(remaining_lengths) or not can_partition_components(free_components, remaining_lengths, partition_cache):
+            return False
+        # Most constrained item: the free cell with the fewest free neighbours.
+        cell = min((cell for cell in range(len(cell_nodes)) if (free_mask >> cell) & 1),
+                   key=lambda cell: ((masks.grow(1 << cell) & free_mask).bit_count(), rng.random()))
+        distinct_lengths = sorted(set(remaining_lengths))
+        rng.shuffle(distinct_lengths)
+        for length in distinct_lengths:
+            for path in paths_through(cell, length, free_mask, diagonals_used, neighbours, steps, rng):
+                if metrics is not None:
+                    metrics.count("exact_cover.rows")
+                path_mask = 0
+                for bit in path:
+                    path_mask |= 1 << bit
+                nodes = [cell_nodes[bit] for bit in path]
+                if placed_letters is None:
+                    options = [(next(name for name in names_left if lengths[name] == length), nodes)]
+                else:
+                    options = [(name, oriented) for name in names_left if lengths[name] == length for oriented in (nodes, nodes[::-1])]
+                for name, oriented in options:
+                    if placed_letters is not None and not placed_letters.place(name, oriented):
+                        placed_letters.remove(name, oriented)
+                        if metrics is not None:
+                            metrics.count("prune.ambiguous_word")
+                        continue
+                    solution[name] = oriented
+                    names_left.remove(name)
+                    if cover(free_mask & ~path_mask):
+                        return True
+                    names_left.append(name)
+                    del solution[name]
+                    if placed_letters is not None:
+                        placed_letters.remove(name, oriented)
         return False
-    for subset in subsets:
-        remaining = [strands[i] for i in range(len(strands)) if i not in subset]
-        if can_partition_components(component_sizes[1:], remaining):
-            return True
+
+    return cover(masks.full & ~used_mask)
+
+def exact_cover_spangram_solve(sorted_strands, index, solution, grid, spangram_direction, masks, rng=random, partition_cache=None, spangram_paths=None, placed_letters=None):
+    """
+    Places the spangram, sorted_strands[index], into the empty grid as the first column of
+    the exact cover problem: its rows are the paths from spangram_paths (if given) and then
+    every path from enumerate_spangram_paths, each kept only if it passes
+    check_spangram_separation_rule, and exact_cover_solve places the other strands under
+    each in turn. With placed_letters both directions of a path are tried.
+    """
+    name, length = sorted_strands[index]
+    remaining_strands = [length for (nm, length) in sorted_strands if nm.upper() != "SPANGRAM"]
+    metrics = SearchMetrics.active
+
+    def candidates():
+        seen = set()
+        if spangram_paths is not None:
+            library = list(spangram_paths)
+            rng.shuffle(library)
+            for nodes, _, diagonals in library:
+                seen.add(tuple(nodes))
+                yield list(nodes), diagonals
+        for nodes, diagonals in enumerate_spangram_paths(grid, length, spangram_direction, rng):
+            if tuple(nodes) not in seen and tuple(nodes[::-1]) not in seen:
+                yield nodes, diagonals
+
+    for nodes, diagonals in candidates():
+        if not check_spangram_separation_rule(nodes, grid, None, remaining_strands, 10, masks, partition_cache):
+            if metrics is not None:
+                metrics.count("spangram.rejected_separation")
+            continue
+        path_mask = masks.mask_of(nodes)
+        if metrics is not None:
+            metrics.count("spangram.placed")
+        for oriented in ([nodes, nodes[::-1]] if placed_letters is not None else [nodes]):
+            if placed_letters is not None and not placed_letters.place(name, oriented):
+                placed_letters.remove(name, oriented)
+                if metrics is not None:
+                    metrics.count("prune.ambiguous_word")
+                continue
+            solution[name] = list(oriented)
+            if exact_cover_solve(sorted_strands, index + 1, path_mask, dict(diagonals), solution, masks, rng, partition_cache, placed_letters):
+                return True
+            del solution[name]
+            if placed_letters is not None:
+                placed_letters.remove(name, oriented)
     return False
 
 # ---------------------
 # Backtracking with connectivity pruning (single-threaded)
 # ---------------------
 
-def backtrack_solve(sorted_strands, index, used, diagonals_used, solution, node_to_coord, grid, all_nodes, spangram_direction):
+def backtrack_solve(sorted_strands, index, used, diagonals_used, solution, node_to_coord, grid, all_nodes, spangram_direction, rng=random, masks=None, used_mask=None, partition_cache=None, spangram_paths=None, placed_letters=None, engine="dfs", prune_dead_cells=False):
+    """
+    used_mask mirrors `used` as a GridBitmasks mask; callers recursing with a placed path
+    pass it updated so connectivity never has to be rebuilt from the set. partition_cache
+    is shared by every can_partition_components call of one solve.
+    spangram_paths, if given, is a list of (path, region sizes, diagonals) tuples from
+    SpangramLibrary.get_spangram_paths; the spangram is then drawn from it instead of
+    being searched for.
+    placed_letters, a PlacedLetters, makes the search word-aware: a strand whose letters
+    let a placed word be traced a second way is rejected as it is placed.
+    With engine="dlx", the spangram is placed by exact_cover_spangram_solve and the strands
+    after it by exact_cover_solve.
+    prune_dead_cells makes dfs_extend check every step of the strands after the spangram
+    with dead_cells_left. It is off by default: on the benchmark corpus it saves iterations
+    on some puzzles and costs them on others.
+    """
     if index == len(sorted_strands):
         return True
+    if masks is None:
+        masks = GridBitmasks(grid)
+    if used_mask is None:
+        used_mask = masks.mask_of(used)
+    if partition_cache is None:
+        partition_cache = {}
+    metrics = SearchMetrics.active
+    if metrics is not None:
+        metrics.count("backtrack.calls")
+    if engine == "dlx":
+        if sorted_strands[index][0].upper() == "SPANGRAM":
+            return exact_cover_spangram_solve(sorted_strands, index, solution, grid, spangram_direction, masks, rng, partition_cache, spangram_paths, placed_letters)
+        return exact_cover_solve(sorted_strands, index, used_mask, diagonals_used, solution, masks, rng, partition_cache, placed_letters)
 
     # Connectivity lookahead.
     remaining_strands_lengths = [length for (_, length) in sorted_strands[index:]]
-    free_components = get_free_components(used, grid, node_to_coord)
+    free_components = masks.component_sizes(masks.full & ~used_mask)
     if free_components and min(free_components) < min(remaining_strands_lengths):
+        if metrics is not None:
+            metrics.count("prune.small_region")
         return False
-    if not can_partition_components(free_components, remaining_strands_lengths):
+    if not can_partition_components(free_components, remaining_strands_lengths, partition_cache):
+        if metrics is not None:
+            metrics.count("prune.partition_infeasible")
         return False
 
     name, length = sorted_strands[index]
+    if name.upper() == "SPANGRAM" and spangram_paths is not None:
+        # Library paths already pass check_spangram_constraint and split the grid into two
+        # large regions, so only the partition into the remaining strands is left to check.
+        remaining_strands = [length for (nm, length) in sorted_strands if nm.upper() != "SPANGRAM"]
+        candidates = list(spangram_paths)
+        rng.shuffle(candidates)
+        for path, regions, diagonals in candidates:
+            if used.intersection(path) or any(diagonals_used.get(key, diag_type) != diag_type for key, diag_type in diagonals.items()):
+                continue
+            if not can_partition_components(regions, remaining_strands, partition_cache):
+                if metrics is not None:
+                    metrics.count("spangram.library_unfit")
+                continue
+            if metrics is not None:
+                metrics.count("spangram.library_placed")
+            claimed = [key for key in diagonals if key not in diagonals_used]
+            used.update(path)
+            for key in claimed:
+                diagonals_used[key] = diagonals[key]
+            solution[name] = list(path)
+            if placed_letters is None or placed_letters.place(name, path):
+                if backtrack_solve(sorted_strands, index + 1, used, diagonals_used, solution, node_to_coord, grid, all_nodes, spangram_direction, rng, masks, used_mask | masks.mask_of(path), partition_cache, spangram_paths, placed_letters, engine, prune_dead_cells):
+                    return True
+            elif metrics is not None:
+                metrics.count("prune.ambiguous_word")
+            if placed_letters is not None:
+                placed_letters.remove(name, path)
+            solution.pop(name, None)
+            used.difference_update(path)
+            for key in claimed:
+                del diagonals_used[key]
+        return False
+
+    # The spangram is placed into an empty grid and split-checked by
+    # check_spangram_separation_rule, so only the later strands are pruned in-path.
+    min_pocket = min(remaining_strands_lengths[1:], default=0) if prune_dead_cells and name.upper() != "SPANGRAM" else None
     remaining_candidates = list(all_nodes - used)
-    random.shuffle(remaining_candidates)
+    rng.shuffle(remaining_candidates)
     for start in remaining_candidates:
-        path = dfs_for_strand(name, length, start, used, node_to_coord, grid, prefer_turn=True, diagonals_used=diagonals_used)
+        diagonals_before = set(diagonals_used)
+        path = dfs_for_strand(name, length, start, used, node_to_coord, grid, prefer_turn=True, diagonals_used=diagonals_used, rng=rng,
+                              masks=masks, used_mask=used_mask, min_pocket=min_pocket)
         if path is not None:
+            path_mask = masks.mask_of(path)
+            placed = True
             # --- If this is the spangram, apply both the original and new rules ---
             if name.upper() == "SPANGRAM":
                 if not check_spangram_constraint(path, grid, spangram_direction):
-                    for node in path:
-                        used.remove(node)
-                    continue
-                # Compute remaining strands (all except the spangram).
-                remaining_strands = [length for (nm, length) in sorted_strands if nm.upper() != "SPANGRAM"]
-                if not check_spangram_separation_rule(path, grid, node_to_coord, remaining_strands, min_free=10):
-                    for node in path:
-                        used.remove(node)
-                    continue
+                    placed = False
+                    if metrics is not None:
+                        metrics.count("spangram.rejected_walls")
+                else:
+                    # Compute remaining strands (all except the spangram).
+                    remaining_strands = [length for (nm, length) in sorted_strands if nm.upper() != "SPANGRAM"]
+                    placed = check_spangram_separation_rule(path, grid, node_to_coord, remaining_strands, min_free=10, masks=masks, partition_cache=partition_cache)
+                    if metrics is not None:
+                        metrics.count("spangram.placed" if placed else "spangram.rejected_separation")
+            elif metrics is not None:
+                metrics.count("strand.placed")
 
-            solution[name] = path
-            if backtrack_solve(sorted_strands, index + 1, used, diagonals_used, solution, node_to_coord, grid, all_nodes, spangram_direction):
-                return True
-            # Backtrack.
+            if placed:
+                solution[name] = path
+                if placed_letters is None or placed_letters.place(name, path):
+                    if backtrack_solve(sorted_strands, index + 1, used, diagonals_used, solution, node_to_coord, grid, all_nodes, spangram_direction, rng, masks, used_mask | path_mask, partition_cache, spangram_paths, placed_letters, engine, prune_dead_cells):
+                        return True
+                elif metrics is not None:
+                    metrics.count("prune.ambiguous_word")
+                if placed_letters is not None:
+                    placed_letters.remove(name, path)
+                solution.pop(name, None)
+            # Backtrack: free the path's nodes and the diagonals it claimed.
             for node in path:
                 used.remove(node)
-            solution.pop(name, None)
+            for square_key in set(diagonals_used) - diagonals_before:
+                del diagonals_used[square_key]
+    if metrics is not None:
+        metrics.count("backtrack.exhausted")
     return False
 
-def solve_partition(strands, grid, spangram_direction):
+def solve_partition(strands, grid, spangram_direction, seed=None, max_iterations=None, time_limit=None, spangram_paths=None, words=None, engine="dfs", prune_dead_cells=False, print_seed=True):
     """
     Partition the grid into disjoint paths for each strand. The strands are reordered so that
-    the spangram is placed first.
+    the spangram is placed first. All random choices come from random.Random(seed); the seed
+    is printed (unless print_seed is False, for callers that report the seed of the run
+    they keep) so a slow or failing run can be replayed exactly.
+    The search gives up and returns None after max_iterations dfs_extend iterations or
+    time_limit seconds, as it does when the randomized tree is exhausted.
+    spangram_paths is passed to backtrack_solve to sample the spangram from a library.
+    words, a dict of strand name to letters (with the spangram's letters under
+    "SPANGRAM"), makes the search reject, as they are placed, strands that would let a
+    theme word or the spangram be traced a second way. Without words only the shape of
+    the layout is searched.
+    engine="dlx" places the spangram and the strands after it by exact cover
+    (exact_cover_spangram_solve) instead of random walks; the result has the same shape
+    either way. prune_dead_cells is passed to backtrack_solve.
+    While SearchMetrics.collect_metrics is active, the search counts its prunes and
+    rejections by reason and appends a report for this call to the collector's solves.
     """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Use one of {', '.join(ENGINES)}.")
+    if seed is None:
+        seed = random.randrange(2**32)
+    if print_seed:
+        print(f"solve_partition seed: {seed}")
+    rng = random.Random(seed)
     node_to_coord = {}
     for i, row in enumerate(grid):
         for j, node in enumerate(row):
@@ -289,11 +838,151 @@ def solve_partition(strands, grid, spangram_direction):
     used = set()
     diagonals_used = {}
     solution = {}
-    if backtrack_solve(sorted_strands, 0, used, diagonals_used, solution, node_to_coord, grid, all_nodes, spangram_direction):
+    masks = GridBitmasks(grid)
+    partition_cache = {}
+    placed_letters = PlacedLetters(masks, words) if words is not None else None
+    metrics = SearchMetrics.active
+    counters_before = dict(metrics.counters) if metrics is not None else None
+    budget_exceeded = False
+    try:
+        with search_budget(max_iterations, time_limit):
+            found = backtrack_solve(sorted_strands, 0, used, diagonals_used, solution, node_to_coord, grid, all_nodes, spangram_direction, rng, masks, 0, partition_cache, spangram_paths, placed_letters, engine, prune_dead_cells)
+    except SearchBudgetExceeded:
+        found = False
+        budget_exceeded = True
+    if metrics is not None:
+        seconds = time.time() - start_time
+        metrics.count("dfs_extend.nodes", global_iterations - start_iterations)
+        metrics.count("solve_partition.calls")
+        metrics.add_time("solve_partition", seconds)
+        metrics.solves.append({
+            "seed": seed,
+            "found": bool(found),
+            "budgetExceeded": budget_exceeded,
+            "iterations": global_iterations - start_iterations,
+            "seconds": seconds,
+            "counters": {name: value - counters_before.get(name, 0) for name, value in sorted(metrics.counters.items()) if value != counters_before.get(name, 0)},
+        })
+    if found:
         return solution
     else:
         return None
 
+# ---------------------
+# Restarts: cut off heavy-tailed searches on a Luby schedule
+# ---------------------
+
+def luby(i):
+    """
+    The i-th term (from 1) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...
+    """
+    while True:
+        k = i.bit_length()
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
+
+def solve_partition_restarts(strands, grid, spangram_direction, seed=None, restart_iterations=DEFAULT_RESTART_ITERATIONS, time_limit=None, is_valid=None, stats=None, spangram_paths=None, words=None, engine="dfs", prune_dead_cells=False):
+    """
+    Runs solve_partition repeatedly with seeds drawn from random.Random(seed) until one
+    returns a layout that passes is_valid (if given). Run i is cut off after
+    restart_iterations * luby(i) dfs_extend iterations, so a search trapped behind a bad
+    early spangram path is restarted instead of run to exhaustion; restart_iterations=None
+    runs every search to the end. Returns None if time_limit seconds pass first.
+    If stats (a dict) is given it is filled with the number of runs, how many were cut off
+    by the budget, exhausted, or rejected by is_valid, the iterations and seconds used, and
+    the seed of the accepted run (None until one is accepted), which replays it with
+    solve_partition alone.
+    spangram_paths, words, engine and prune_dead_cells are passed on to every
+    solve_partition run.
+    """
+    if seed is None:
+        seed = random.randrange(2**32)
+    print(f"solve_partition_restarts seed: {seed}")
+    seeds = random.Random(seed)
+    if stats is None:
+        stats = {}
+    stats.update(runs=0, cutoffs=0, exhausted=0, rejected=0, iterations=0, seconds=0.0, seed=None)
+    start = time.time()
+    try:
+        while True:
+            remaining = None
+            if time_limit is not None:
+                remaining = time_limit - (time.time() - start)
+                if remaining <= 0:
+                    return None
+            stats["runs"] += 1
+            budget = restart_iterations * luby(stats["runs"]) if restart_iterations is not None else None
+            iterations_before = global_iterations
+            run_seed = seeds.randrange(2**32)
+            solution = solve_partition(strands, grid, spangram_direction, run_seed, budget, remaining, spangram_paths, words, engine, prune_dead_cells, print_seed=False)
+            used_iterations = global_iterations - iterations_before
+            stats["iterations"] += used_iterations
+            if solution is None:
+                if budget is not None and used_iterations > budget:
+                    stats["cutoffs"] += 1
+                else:
+                    stats["exhausted"] += 1
+            elif is_valid is None or is_valid(solution):
+                stats["seed"] = run_seed
+                return solution
+            else:
+                stats["rejected"] += 1
+    finally:
+        stats["seconds"] = time.time() - start
+
+# ---------------------
+# Parallel search: race independent randomized searches across processes
+# ---------------------
+
+def solve_partition_worker(args):
+    strands, grid, spangram_direction, seed, max_iterations, spangram_paths, words, engine, prune_dead_cells = args
+    return seed, solve_partition(strands, grid, spangram_direction, seed, max_iterations, spangram_paths=spangram_paths, words=words, engine=engine,
+                                 prune_dead_cells=prune_dead_cells, print_seed=False)
+
+def solve_partition_parallel(strands, grid, spangram_direction, processes=None, is_valid=None, seed=None, restart_iterations=DEFAULT_RESTART_ITERATIONS, time_limit=None, spangram_paths=None, words=None, engine="dfs", prune_dead_cells=False):
+    """
+    Runs independent randomized solve_partition searches in a process pool and returns the
+    first solution that is not None and passes is_valid (if given). Rejected or empty
+    results are replaced by a fresh search, and the pool is terminated as soon as a
+    solution is accepted, cancelling the searches still running.
+    Each search gets its own seed drawn from random.Random(seed), and the seed of the
+    accepted search is printed so it can be replayed with solve_partition alone.
+    The i-th search submitted is budgeted as in solve_partition_restarts, and None is
+    returned if time_limit seconds pass without an accepted solution.
+    words, engine and prune_dead_cells are passed to every search.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if seed is None:
+        seed = random.randrange(2**32)
+    print(f"solve_partition_parallel seed: {seed}")
+    seeds = random.Random(seed)
+    results = queue.Queue()
+    submitted = 0
+    end = time.time() + time_limit if time_limit is not None else None
+    with multiprocessing.Pool(processes) as pool:
+        def submit():
+            nonlocal submitted
+            submitted += 1
+            budget = restart_iterations * luby(submitted) if restart_iterations is not None else None
+            pool.apply_async(solve_partition_worker, ((strands, grid, spangram_direction, seeds.randrange(2**32), budget, spangram_paths, words, engine, prune_dead_cells),),
+                             callback=results.put, error_callback=results.put)
+        for _ in range(processes):
+            submit()
+        while True:
+            try:
+                result = results.get(timeout=max(end - time.time(), 0) if end is not None else None)
+            except queue.Empty:
+                return None
+            if isinstance(result, BaseException):
+                raise result
+            search_seed, solution = result
+            if solution is not None and (is_valid is None or is_valid(solution)):
+                print(f"Accepted layout from solve_partition seed: {search_seed}")
+                return solution
+            submit()
+
 # ---------------------
 # Main block: example data, solving, and visualization
 # ---------------------
@@ -1,12 +1,17 @@
 import random
+from collections import deque
 import matplotlib.pyplot as plt
 import networkx as nx
 import matplotlib.patches as mpatches
 from tqdm import tqdm
-from itertools import permutations
 
 class StrandsSolverV2:
-    def __init__(self, themeWords, spangram, grid_dimensions, spangram_direction):
+    def __init__(self, themeWords, spangram, grid_dimensions, spangram_direction, seed=None, max_attempts=1000):
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        print("StrandsSolverV2 seed: ", seed)
         letterCount = len(spangram)
         for word in themeWords:
             letterCount += len(word)
@@ -14,11 +19,11 @@ class StrandsSolverV2:
             raise ValueError(f"The total number of letters in the theme words and spangram must equal the number of cells in the grid. \n Total letters: {letterCount}\n Grid size:{grid_dimensions[0]} x {grid_dimensions[1]} \n Required Letter Total: {grid_dimensions[0] * grid_dimensions[1]}")
 
         if spangram_direction == "horizontal":
-            self.spangramDirection = random.choice([[0, 1], [0, -1]])
+            self.spangramDirection = self.rng.choice([[0, 1], [0, -1]])
             if len(spangram) < grid_dimensions[1]:
                 raise ValueError("The spangram must be longer than the grid width when the direction is horizontal.")
         elif spangram_direction == "vertical":
-            self.spangramDirection = random.choice([[1, 0], [-1, 0]])
+            self.spangramDirection = self.rng.choice([[1, 0], [-1, 0]])
             if len(spangram) < grid_dimensions[0]:
                 raise ValueError("The spangram must be longer than the grid height when the direction is vertical.")
         else:
@@ -26,6 +31,7 @@ class StrandsSolverV2:
 
         self.themeWords = themeWords
         self.spangram = spangram
+        self.spangram_direction = spangram_direction
         self.grid_dimensions = grid_dimensions
         self.strandLengths = [len(word) for word in themeWords]
         self.spangramLength = len(spangram)
@@ -36,25 +42,25 @@ class StrandsSolverV2:
                                     [0, -1],           [0, 1],
                                     [1, -1],  [1, 0],  [1, 1]]
 
-        allValidGridSizePairs = self.find_valid_grid_size_pairs(self.themeWords)
-        self.allUniqueGridSizePairs = []
-        seen_pairs = set()
-        for pair in allValidGridSizePairs:
-            sorted_pair = (pair[0], tuple(sorted(pair[1], key=lambda x: -len(x))))
-            if sorted_pair not in seen_pairs:
-                seen_pairs.add(sorted_pair)
-                self.allUniqueGridSizePairs.append([pair[0], list(sorted_pair[1])])
-        self.allUniqueGridSizePairs.sort(key=lambda x: x[0])
+        # Region size -> every distinct subset of theme words that exactly fills it.
+        self.gridSizeIndex = self.find_valid_grid_size_pairs(self.themeWords)
+        self.allUniqueGridSizePairs = [[size, words] for size in sorted(self.gridSizeIndex) for words in self.gridSizeIndex[size]]
 
 
         print("All Unique Grid Size pairs: ")
         for pair in self.allUniqueGridSizePairs:
             print(pair)
-        self.allValidGridSizes = sorted(list(set([pair[0] for pair in self.allUniqueGridSizePairs])))
+        self.allValidGridSizes = sorted(self.gridSizeIndex)
         print("All Valid Grid Sizes: ", self.allValidGridSizes)
         
         
-        calculatedStrandsGraph = self.calculate_strands_graph(self.spangramSlack, self.spangramDirection, self.grid_dimensions)
+        # Each attempt draws a new random spangram; most dead ends are found within a few.
+        for attempt in range(max_attempts):
+            calculatedStrandsGraph = self.calculate_strands_graph(self.spangramSlack, self.spangramDirection, self.grid_dimensions)
+            if calculatedStrandsGraph is not None:
+                break
+        else:
+            raise ValueError(f"No layout found in {max_attempts} attempts.")
         self.grid = calculatedStrandsGraph[0]
         self.strandPaths = calculatedStrandsGraph[1]
         self.spangramPath = calculatedStrandsGraph[2]
@@ -66,30 +72,36 @@ class StrandsSolverV2:
         strandPaths = {themeWord: [] for themeWord in self.themeWords}
 
         # Calculate Spangram Path
-        startingNode = random.choice(self.possibleStrandStartNodes)
+        startingNode = self.rng.choice(self.possibleStrandStartNodes)
         spangramSlack = self.update_spangram_slack(spangramSlack, spangramDirection, startingNode, grid_dimensions)
         spangramPath = self.calculate_spangram_path(self.spangramLength, grid, startingNode, self.calculate_new_permitted_directions(spangramSlack), spangramSlack)
+        if spangramPath is None:
+            return None
         for index, node in enumerate(spangramPath):
-            grid[node] = spangram[index]
+            grid[node] = self.spangram[index]
         
         # Calculate Strand Paths
 
         allEdges = spangramPath
 
+        # Each free region left by the spangram gets its own subset of the theme words and
+        # is solved on its own; strands never leave their region.
         seperateGrids = self.Calculate_seperate_grids(grid, allEdges, grid_dimensions)
-        print("Word: ", self.themeWords[0])
-        print("All theme words: ", self.themeWords)
-        for y in range(grid_dimensions[0]):
-            for x in range(grid_dimensions[1]):
-                print((y,x) if (y,x) in seperateGrids[0] else "xxxxxx", end=" ")
-            print()
-        
-        strandPaths[self.themeWords[0]] = self.calculate_strand_path(self.strandLengths[0], seperateGrids[0], random.choice(list(seperateGrids[0].keys())), self.themeWords[0], self.get_illegal_edges(spangramPath))
-
-        for themeWord in self.themeWords:
-            for strandPath in strandPaths[themeWord]:
-                pass
-                #strandPaths[themeWord] = self.calculate_strand_path(themeWord, strandPath, grid, self.permittedDirections)
+        disallowedEdges = self.get_illegal_edges(spangramPath)
+        placedPaths = None
+        for assignment in self.assign_words_to_regions(seperateGrids, self.themeWords):
+            placedPaths = {}
+            for region, words in zip(seperateGrids, assignment):
+                regionPaths = self.find_valid_strand_path(region, words, set(disallowedEdges))
+                if regionPaths is None:
+                    placedPaths = None
+                    break
+                placedPaths.update(regionPaths)
+            if placedPaths is not None:
+                break
+        if placedPaths is None:
+            return None
+        strandPaths.update(placedPaths)
 
         for themeWord in self.themeWords:
             for index, node in enumerate(strandPaths[themeWord]):
@@ -97,9 +109,17 @@ class StrandsSolverV2:
 
         return grid, strandPaths, spangramPath
     
-    def calculate_strand_path(self, remainingLength, currentGrid, currentPosition, word, disallowedEdges:list, workingStrand=[]):
+    def calculate_strand_path(self, remainingLength, currentGrid, currentPosition, word, disallowedEdges:set, workingStrand=None):
+        """
+        Random depth-first search for a path spelling word from currentPosition. The search
+        mutates currentGrid, disallowedEdges (a set of (from, to) moves) and workingStrand in
+        place and undoes each step on backtracking, so a step costs the same however long
+        the path is. On success the letters stay in currentGrid.
+        """
+        if workingStrand is None:
+            workingStrand = []
         if remainingLength == 0:
-            return workingStrand
+            return list(workingStrand)
         if remainingLength == 1:
             currentGrid[currentPosition] = word[len(word) - 1]
             return workingStrand + [currentPosition]
@@ -109,60 +129,83 @@ class StrandsSolverV2:
             newPosition = (currentPosition[0] + direction[0], currentPosition[1] + direction[1])
             if newPosition not in currentGrid or currentGrid[newPosition] != None:
                 continue
-            if [currentPosition,newPosition] in disallowedEdges:
+            if (currentPosition, newPosition) in disallowedEdges:
                 continue
             legalDirections.append(direction)
         
         #self.visualise_grid()
-        result = None
-        newDissallowedEdges = disallowedEdges.copy()
-        while result is None:
-            if len(legalDirections) == 0:
-                return None
-                #self.visualise_grid()
-            chosenDirection  = random.choice(legalDirections)
+        currentGrid[currentPosition] = word[len(word) - remainingLength]
+        workingStrand.append(currentPosition)
+        # Edges blocked by a failed diagonal stay blocked for the remaining directions at
+        # this level, as they always have; they are released when this level gives up.
+        addedEdges = []
+        while legalDirections:
+            chosenDirection  = self.rng.choice(legalDirections)
             newPosition = (currentPosition[0] + chosenDirection[0], currentPosition[1] + chosenDirection[1])
-            if chosenDirection[0] != 0 and chosenDirection[1] != 0: # diagonal rule
-                newDissallowedEdges.append([(currentPosition[0]+chosenDirection[0], currentPosition[1]),
-                                            (currentPosition[0], currentPosition[1]+chosenDirection[1])])
-                newDissallowedEdges.append([(currentPosition[0], currentPosition[1]+chosenDirection[1]),
-                                            (currentPosition[0]+chosenDirection[0], currentPosition[1])])
-                
-            currentGrid[currentPosition] = word[len(word) - remainingLength]
-            result = self.calculate_strand_path(remainingLength - 1, dict(currentGrid), newPosition, word, newDissallowedEdges, list(workingStrand + [currentPosition]))
-            if result is None:
-                legalDirections.remove(chosenDirection)
-        return result
+            addedEdges += self.block_crossing_edges(currentPosition, chosenDirection, disallowedEdges)
+            result = self.calculate_strand_path(remainingLength - 1, currentGrid, newPosition, word, disallowedEdges, workingStrand)
+            if result is not None:
+                return result
+            legalDirections.remove(chosenDirection)
+        disallowedEdges.difference_update(addedEdges)
+        workingStrand.pop()
+        currentGrid[currentPosition] = None
+        return None
+
+    def block_crossing_edges(self, currentPosition, chosenDirection, disallowedEdges):
+        """
+        Adds the two moves crossing a diagonal step to disallowedEdges and returns the ones
+        that were not already there, so the caller can remove exactly those again.
+        """
+        if chosenDirection[0] == 0 or chosenDirection[1] == 0: # diagonal rule
+            return ()
+        a = (currentPosition[0]+chosenDirection[0], currentPosition[1])
+        b = (currentPosition[0], currentPosition[1]+chosenDirection[1])
+        addedEdges = [edge for edge in ((a, b), (b, a)) if edge not in disallowedEdges]
+        disallowedEdges.update(addedEdges)
+        return addedEdges
     
     def find_valid_grid_size_pairs(self, themeWords):
-
-        allSizes = []
-        for perm in permutations(themeWords):
-            combined_length = 0
-            for i in range(len(perm)):
-                combined_length += len(perm[i])
-                allSizes.append([combined_length, set(perm[:i+1])])
-        return allSizes
+        """
+        Returns {size: [word subsets]} listing, for each total length a non-empty subset of
+        themeWords can reach, every distinct such subset with its words longest first.
+        Subset sums are filled in over bitmasks, one addition per subset, so n words cost
+        2^n steps rather than the n! of walking every permutation's prefixes.
+        """
+        lengths = [len(word) for word in themeWords]
+        sums = [0] * (1 << len(themeWords))
+        index = {}
+        seen = set()
+        for mask in range(1, 1 << len(themeWords)):
+            lowest = mask & -mask
+            sums[mask] = sums[mask ^ lowest] + lengths[lowest.bit_length() - 1]
+            words = tuple(sorted((word for i, word in enumerate(themeWords) if mask >> i & 1), key=lambda x: -len(x)))
+            # Repeated theme words would otherwise list the same subset more than once.
+            if words not in seen:
+                seen.add(words)
+                index.setdefault(sums[mask], []).append(list(words))
+        return index
 
     def Calculate_seperate_grids(self, grid, allEdges, grid_dimensions):
         free_spaces = [position for position in grid.keys() if grid[position] is None]
+        unassigned = set(free_spaces)
         seperateGrids = []
         
         # Continue until no free spaces remain
-        while free_spaces:
+        for position in free_spaces:
+            if position not in unassigned:
+                continue
             # Start a new grid from the first free space available
-            new_grid = self.findable_grid_from_point(grid, allEdges, grid_dimensions, free_spaces[0])
+            new_grid = self.findable_grid_from_point(grid, allEdges, grid_dimensions, position)
             seperateGrids.append(new_grid)
             
-            # Remove positions in the new grid from the list of free spaces
-            for position in new_grid.keys():
-                if position in free_spaces:
-                    free_spaces.remove(position)
+            # Remove positions in the new grid from the free spaces
+            unassigned.difference_update(new_grid.keys())
         
         return seperateGrids
 
 
-    def findable_grid_from_point(self, grid, allEdges, grid_dimensions, startingNode, workingGridEdges=[]):
+    def findable_grid_from_point(self, grid, allEdges, grid_dimensions, startingNode, workingGridEdges=None):
         """
         Returns all connected free cells (i.e. cells where grid[position] is None)
         reachable from startingNode without crossing barrier cells.
@@ -178,13 +221,18 @@ class StrandsSolverV2:
         Returns:
             A dictionary of positions that are reachable, mapping each cell to its grid value.
         """
+        # Steps along allEdges in both directions, so a diagonal crossing one is a set lookup.
+        barrierSteps = set(zip(allEdges, allEdges[1:])) | set(zip(allEdges[1:], allEdges))
+        blockedMoves = set()
+        for edge in workingGridEdges or ():
+            blockedMoves.add((tuple(edge[0]), tuple(edge[1])))
+            blockedMoves.add((tuple(edge[1]), tuple(edge[0])))
         # Initialize the data structure to keep track of visited nodes.
         reachable = {}
-        # Use a list as a queue for our BFS.
-        queue = [startingNode]
+        queue = deque([startingNode])
 
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             # If we have already visited this cell, skip it.
             if current in reachable:
                 continue
@@ -202,20 +250,12 @@ class StrandsSolverV2:
                 if grid[neighbor] is not None:
                     continue
                 # Optional: Skip if this move is blocked by any extra edge restrictions.
-                if [current, neighbor] in workingGridEdges or [neighbor, current] in workingGridEdges:
+                if (current, neighbor) in blockedMoves:
                     continue
                 
-                diagonalRuleBroken = False
                 if d[0] != 0 and d[1] != 0: # diagonal rule
-                    disallowedEdge = [(current[0]+d[0], current[1]),
-                                        (current[0], current[1]+d[1])]
-
-                    for index in range(len(allEdges)-1):
-                        if (disallowedEdge[0] == allEdges[index] and disallowedEdge[1] == allEdges[index+1]) or (disallowedEdge[1] == allEdges[index] and disallowedEdge[0] == allEdges[index+1]):
-                            diagonalRuleBroken = True
-                            break
-                if diagonalRuleBroken:
-                    continue
+                    if ((current[0]+d[0], current[1]), (current[0], current[1]+d[1])) in barrierSteps:
+                        continue
 
                 if neighbor not in reachable:
                     queue.append(neighbor)
@@ -237,13 +277,22 @@ class StrandsSolverV2:
         print(f"Success rate: {correct_attempts/total_attempts}")
         
 
-    def calculate_spangram_path(self, remainingLength, currentGrid, currentPosition, permittedDirections, spangramSlack, workingSpangram=[], disallowedEdges:list=[], reverseSlack=0):
+    def calculate_spangram_path(self, remainingLength, currentGrid, currentPosition, permittedDirections, spangramSlack, workingSpangram=None, disallowedEdges:set=None, reverseSlack=0):
+        """
+        Random depth-first search for the spangram path. Like calculate_strand_path it
+        mutates currentGrid, workingSpangram and disallowedEdges in place and undoes each
+        step on backtracking.
+        """
+        if workingSpangram is None:
+            workingSpangram = []
+        if disallowedEdges is None:
+            disallowedEdges = set()
         if remainingLength == 0:
-            return workingSpangram
+            return list(workingSpangram)
         if remainingLength == 1:
             currentGrid[currentPosition] = self.spangram[self.spangramLength - 1]
             return workingSpangram + [currentPosition]
-        if spangram_direction == "horizontal" and reverseSlack != float("inf"):
+        if self.spangram_direction == "horizontal" and reverseSlack != float("inf"):
             startingWall = 0 if self.spangramDirection[1] == 1 else self.grid_dimensions[1] - 1
             distanceFromWall = abs(currentPosition[1] - startingWall)
             totalDistanceToGo = distanceFromWall + self.grid_dimensions[1] - 1
@@ -251,7 +300,7 @@ class StrandsSolverV2:
                 reverseSlack = float("inf")
             if remainingLength == totalDistanceToGo:
                 reverseSlack = 0
-        if spangram_direction == "vertical" and reverseSlack != float("inf"):
+        if self.spangram_direction == "vertical" and reverseSlack != float("inf"):
             startingWall = 0 if self.spangramDirection[0] == 1 else self.grid_dimensions[0] - 1
             distanceFromWall = abs(currentPosition[0] - startingWall)
             totalDistanceToGo = distanceFromWall + self.grid_dimensions[0] - 1
@@ -265,33 +314,27 @@ class StrandsSolverV2:
             newPosition = (currentPosition[0] + direction[0], currentPosition[1] + direction[1])
             if newPosition not in currentGrid or currentGrid[newPosition] != None:
                 continue
-            if [currentPosition,newPosition] in disallowedEdges:
+            if (currentPosition, newPosition) in disallowedEdges:
                 continue
             if reverseSlack == 0:
-                if spangram_direction == "horizontal":
+                if self.spangram_direction == "horizontal":
                     if direction[1] == self.spangramDirection[1]:
                         continue
-                if spangram_direction == "vertical":
+                if self.spangram_direction == "vertical":
                     if direction[0] == self.spangramDirection[0]:
                         continue
             legalDirections.append(direction)
         
         #self.visualise_grid()
-        result = None
         backupSpangramSlack = spangramSlack
-        newDissallowedEdges = disallowedEdges.copy()
-        while result is None:
+        currentGrid[currentPosition] = self.spangram[self.spangramLength - remainingLength]
+        workingSpangram.append(currentPosition)
+        addedEdges = []
+        while legalDirections:
             spangramSlack = backupSpangramSlack
-            if len(legalDirections) == 0:
-                return None
-                #self.visualise_grid()
-            chosenDirection  = random.choice(legalDirections)
+            chosenDirection  = self.rng.choice(legalDirections)
             newPosition = (currentPosition[0] + chosenDirection[0], currentPosition[1] + chosenDirection[1])
-            if chosenDirection[0] != 0 and chosenDirection[1] != 0: # diagonal rule
-                newDissallowedEdges.append([(currentPosition[0]+chosenDirection[0], currentPosition[1]),
-                                            (currentPosition[0], currentPosition[1]+chosenDirection[1])])
-                newDissallowedEdges.append([(currentPosition[0], currentPosition[1]+chosenDirection[1]),
-                                            (currentPosition[0]+chosenDirection[0], currentPosition[1])])
+            addedEdges += self.block_crossing_edges(currentPosition, chosenDirection, disallowedEdges)
             if self.spangramDirection[0] == 0: # horizontal
                 if chosenDirection[1] == -1*self.spangramDirection[1]:
                     spangramSlack -= 2
@@ -310,23 +353,26 @@ class StrandsSolverV2:
                     newPermittedDirections = self.calculate_new_permitted_directions(spangramSlack)
                 else:
                     newPermittedDirections = permittedDirections
-            currentGrid[currentPosition] = self.spangram[self.spangramLength - remainingLength]
-            result = self.calculate_spangram_path(remainingLength - 1, dict(currentGrid), newPosition, list(newPermittedDirections), spangramSlack, list(workingSpangram + [currentPosition]), newDissallowedEdges, reverseSlack=reverseSlack)
-            if result is None:
-                legalDirections.remove(chosenDirection)
-        return result
+            result = self.calculate_spangram_path(remainingLength - 1, currentGrid, newPosition, newPermittedDirections, spangramSlack, workingSpangram, disallowedEdges, reverseSlack=reverseSlack)
+            if result is not None:
+                return result
+            legalDirections.remove(chosenDirection)
+        disallowedEdges.difference_update(addedEdges)
+        workingSpangram.pop()
+        currentGrid[currentPosition] = None
+        return None
         
     
     def calculate_new_permitted_directions(self, spangramSlack):
         if spangramSlack < 0:
             raise ValueError("The spangram slack is negative.")
         elif spangramSlack == 0:
-            if spangram_direction == "horizontal":
+            if self.spangram_direction == "horizontal":
                 return [direction for direction in self.permittedDirections if direction[1] == self.spangramDirection[1]]
             else:
                 return[direction for direction in self.permittedDirections if direction[0] == self.spangramDirection[0]]
         elif spangramSlack == 1:
-            if spangram_direction == "horizontal":
+            if self.spangram_direction == "horizontal":
                 return[direction for direction in self.permittedDirections if direction[1] != -1*self.spangramDirection[1]]
             else:
                 return[direction for direction in self.permittedDirections if direction[0] != -1*self.spangramDirection[0]]
@@ -356,15 +402,12 @@ class StrandsSolverV2:
         return slackValue
     
     def get_illegal_edges(self, strandPath):
-        illegalEdges = []
+        illegalEdges = set()
         
         for index in range(len(strandPath)-1):
             direction = [strandPath[index+1][0] - strandPath[index][0], strandPath[index+1][1] - strandPath[index][1]]
             if direction[0] != 0 and direction[1] != 0: # diagonal
-                illegalEdges.append([(strandPath[index][0]+direction[0],strandPath[index][1]),
-                                     (strandPath[index][0],strandPath[index][1]+direction[1])])
-                illegalEdges.append([(strandPath[index][0],strandPath[index][1]+direction[1]),
-                                     (strandPath[index][0]+direction[0],strandPath[index][1])])
+                self.block_crossing_edges(strandPath[index], direction, illegalEdges)
         return illegalEdges
 
     def get_possible_strand_start_nodes(self):
@@ -394,8 +437,90 @@ class StrandsSolverV2:
         return validPossibleStartNodes
             
 
-    def find_valid_strand_path(self):
-        pass
+    def assign_words_to_regions(self, regions, words):
+        """
+        Yields every way of giving each region a subset of words whose lengths add up to
+        the region's size, using every word once, as a list of word lists aligned with
+        regions. Subsets are looked up by size in gridSizeIndex.
+        """
+        if not regions:
+            if not words:
+                yield []
+            return
+        size = len(regions[0])
+        remaining = set(words)
+        for pairWords in self.gridSizeIndex.get(size, []):
+            if not remaining.issuperset(pairWords):
+                continue
+            rest = [word for word in words if word not in pairWords]
+            for assignment in self.assign_words_to_regions(regions[1:], rest):
+                yield [list(pairWords)] + assignment
+
+    def find_free_regions(self, region, disallowedEdges):
+        """
+        Splits the free cells of region into connected regions, following only moves that
+        disallowedEdges does not block.
+        """
+        unassigned = {position for position, value in region.items() if value is None}
+        regions = []
+        while unassigned:
+            startingNode = unassigned.pop()
+            reachable = {startingNode: None}
+            queue = deque([startingNode])
+            while queue:
+                current = queue.popleft()
+                for d in self.permittedDirections:
+                    neighbor = (current[0] + d[0], current[1] + d[1])
+                    if neighbor in unassigned and (current, neighbor) not in disallowedEdges:
+                        unassigned.remove(neighbor)
+                        reachable[neighbor] = None
+                        queue.append(neighbor)
+            regions.append(reachable)
+        return regions
+
+    def find_valid_strand_path(self, region, words, disallowedEdges):
+        """
+        Places every word in words as a strand inside region (a dict of free cells, as
+        returned by Calculate_seperate_grids) so that together they fill it exactly.
+        The longest word is placed first; whenever a placement splits the remaining cells,
+        the pieces are assigned their own word subsets and solved separately. Returns
+        {word: path}, or None if this search finds no placement.
+        """
+        if not words:
+            return {}
+        freeRegions = self.find_free_regions(region, disallowedEdges)
+        if len(freeRegions) > 1:
+            for assignment in self.assign_words_to_regions(freeRegions, words):
+                placedPaths = {}
+                for freeRegion, regionWords in zip(freeRegions, assignment):
+                    regionPaths = self.find_valid_strand_path(freeRegion, regionWords, set(disallowedEdges))
+                    if regionPaths is None:
+                        placedPaths = None
+                        break
+                    placedPaths.update(regionPaths)
+                if placedPaths is not None:
+                    return placedPaths
+            return None
+
+        freeRegion = freeRegions[0] if freeRegions else {}
+        word = max(words, key=len)
+        rest = list(words)
+        rest.remove(word)
+        startingNodes = list(freeRegion.keys())
+        self.rng.shuffle(startingNodes)
+        for startingNode in startingNodes:
+            edgesBefore = set(disallowedEdges)
+            strandPath = self.calculate_strand_path(len(word), freeRegion, startingNode, word, disallowedEdges)
+            if strandPath is not None:
+                placedPaths = self.find_valid_strand_path(freeRegion, rest, disallowedEdges)
+                if placedPaths is not None:
+                    placedPaths[word] = strandPath
+                    return placedPaths
+                for position in strandPath:
+                    freeRegion[position] = None
+            disallowedEdges.intersection_update(edgesBefore)
+        return None
+
     def getGrid(self):
         return self.grid
     def getStrandPaths(self):
@@ -468,6 +593,5 @@ if __name__ == "__main__":
     grid_dimensions = (8, 6) # 8 rows, 6 columns
     spangram_direction = "vertical"
     solver = StrandsSolverV2(themeWords, spangram, grid_dimensions, spangram_direction)
-    strand_path = solver.find_valid_strand_path()
-    solver.visualise_grid(solver.getGrid(), solver.getStrandPaths(), solver.getSpangramPath())
-    print(strand_path)
\ No newline at end of file
+    print(solver.getStrandPaths())
+    solver.visualise_grid(solver.getGrid(), solver.getStrandPaths(), solver.getSpangramPath())
\ No newline at end of file
@@ -1,6 +1,8 @@
+import time
 from WordTrie import WordTrie
+import SearchMetrics
 
-def findWords(board: list, wordTrie, currentPoint: tuple, foundWords: list = None, workingStrand: tuple = None):
+def findWords(board: list, wordTrie, currentPoint: tuple, foundWords: list = None, workingStrand: tuple = None, trieNode=None):
     if foundWords is None:
         foundWords = []
     if workingStrand is None:
@@ -8,6 +10,16 @@ def findWords(board: list, wordTrie, currentPoint: tuple, foundWords: list = Non
     
     row, col = currentPoint
     letter = board[row][col]
+
+    # The trie cursor for current_str + letter; callers inside the recursion pass it down
+    # so the prefix is never re-walked from the root.
+    if trieNode is None:
+        trieNode = wordTrie.root
+        for char in workingStrand[0] + letter:
+            trieNode = wordTrie.step(trieNode, char)
+            if trieNode is None:
+                return foundWords
+
     # Mark the board as visited
     board[row][col] = None
     
@@ -17,13 +29,9 @@ def findWords(board: list, wordTrie, currentPoint: tuple, foundWords: list = Non
     path = path + [currentPoint]  # create a new list so each branch is independent
     
     # If the current string is a complete word, add it to the found words.
-    wordTrieSearch = wordTrie.search(current_str)
-    if wordTrieSearch[0]:
+    if wordTrie.is_word(trieNode):
         foundWords.append((current_str, path))
     
-    # Get feasible next letters from the trie based on the current prefix.
-    feasibleNextLetters = set(wordTrieSearch[1])
-    
     # All possible directions (8-connected neighbors)
     directions = [(row+1, col), (row-1, col), (row, col+1), (row, col-1),
                   (row+1, col+1), (row-1, col-1), (row+1, col-1), (row-1, col+1)]
@@ -31,50 +39,156 @@ def findWords(board: list, wordTrie, currentPoint: tuple, foundWords: list = Non
     # Explore all valid moves that are feasible according to the trie.
     for newX, newY in directions:
         if 0 <= newX < len(board) and 0 <= newY < len(board[0]) and board[newX][newY] is not None:
-            if board[newX][newY] in feasibleNextLetters:
-                findWords(board, wordTrie, (newX, newY), foundWords, (current_str, path))
+            nextNode = wordTrie.step(trieNode, board[newX][newY])
+            if nextNode is not None:
+                findWords(board, wordTrie, (newX, newY), foundWords, (current_str, path), nextNode)
     
     # Backtracking: restore the current board cell.
     board[row][col] = letter
     return foundWords
-def validatePuzzle(board: list, wordTrie, importantWords: list):
-    allWords = []
-    for row in range(len(board)):
-        for col in range(len(board[0])):
-            allWords.append(findWords(board, wordTrie, (row, col)))
-    allWordsJoined = []
-    for sublist in allWords:
-        allWordsJoined += sublist
 
-    print("All important words found:", [word for word in allWordsJoined if word[0] in importantWords])
+# Neighbour tables are cached per board shape. Cells are numbered row * cols + col and the
+# neighbours are listed in the same order findWords tries its directions.
+neighbourTables = {}
+
+def getNeighbourTable(rows: int, cols: int):
+    key = (rows, cols)
+    if key not in neighbourTables:
+        table = []
+        for row in range(rows):
+            for col in range(cols):
+                directions = [(row+1, col), (row-1, col), (row, col+1), (row, col-1),
+                              (row+1, col+1), (row-1, col-1), (row+1, col-1), (row-1, col+1)]
+                table.append(tuple(newX * cols + newY for newX, newY in directions
+                                   if 0 <= newX < rows and 0 <= newY < cols))
+        neighbourTables[key] = table
+    return neighbourTables[key]
+
+def enumerateWords(board: list, wordTrie):
+    """
+    Returns every (word, path) traceable on the board, in the same order as running
+    findWords from each cell. Visited cells are tracked in an integer bitmask and the
+    coordinate list is only built for paths that spell a word. Cells set to None are
+    treated as blocked.
+    """
+    if not board or not board[0]:
+        return []
+    metrics = SearchMetrics.active
+    if metrics is not None:
+        start = time.perf_counter()
+    rows, cols = len(board), len(board[0])
+    neighbours = getNeighbourTable(rows, cols)
+    letters = [board[row][col] for row in range(rows) for col in range(cols)]
+    step = wordTrie.step
+    is_word = wordTrie.is_word
+    foundWords = []
+    path = []
+
+    def extend(cell, node, visited, current_str):
+        path.append(cell)
+        if is_word(node):
+            foundWords.append((current_str, [divmod(index, cols) for index in path]))
+        for neighbour in neighbours[cell]:
+            if not (visited >> neighbour) & 1 and letters[neighbour] is not None:
+                nextNode = step(node, letters[neighbour])
+                if nextNode is not None:
+                    extend(neighbour, nextNode, visited | (1 << neighbour), current_str + letters[neighbour])
+        path.pop()
+
+    for cell in range(rows * cols):
+        if letters[cell] is None:
+            continue
+        node = step(wordTrie.root, letters[cell])
+        if node is not None:
+            extend(cell, node, 1 << cell, letters[cell])
+    if metrics is not None:
+        metrics.count("word_finder.enumerateWords.calls")
+        metrics.count("word_finder.enumerateWords.traces", len(foundWords))
+        metrics.add_time("word_finder.enumerateWords", time.perf_counter() - start)
+    return foundWords
+
+def checkImportantWords(importantFound: list, importantWords: list):
+    """
+    importantFound is the list of (word, path) traces of important words on a board.
+    Valid when every important word is traced, and only ever over one set of cells.
+    """
+    print("All important words found:", importantFound)
 
     valid = True
     wordCoordSet = {}
-    for word in allWordsJoined:
-        if word[0] not in importantWords:
-            continue
-        try:
+    for word in importantFound:
+        if word[0] in wordCoordSet:
             if wordCoordSet[word[0]] != set(word[1]):
                 print("This word was found in multiple locations:")
                 print(word[0])
                 valid = False
-        except:
+        else:
             wordCoordSet[word[0]] = set(word[1])
     for word in importantWords:
-        if word not in [words[0] for words in allWordsJoined]:
+        if word not in wordCoordSet:
             print("This word was not found:")
             print(word)
             valid = False
     return valid
+def validatePuzzle(board: list, wordTrie, importantWords: list):
+    importantWordSet = set(importantWords)
+    return checkImportantWords([word for word in enumerateWords(board, wordTrie) if word[0] in importantWordSet], importantWords)
+def analyseBoard(board: list, wordTrie, importantWords: list, importantTrie=None):
+    """
+    One board scan that does the work of calculateSetOfWords(board, wordTrie) and
+    validatePuzzle(board, importantTrie, importantWords) together, by walking both tries
+    in lockstep. importantTrie defaults to a WordTrie of importantWords (theme words may
+    be missing from the main dictionary, so they need their own trie).
+    Returns (set of dictionary words, list of (word, path) for important words, valid).
+    """
+    if not board or not board[0]:
+        return set(), [], checkImportantWords([], importantWords)
+    metrics = SearchMetrics.active
+    if metrics is not None:
+        start = time.perf_counter()
+    if importantTrie is None:
+        importantTrie = WordTrie()
+        for word in importantWords:
+            importantTrie.insert(word)
+    rows, cols = len(board), len(board[0])
+    neighbours = getNeighbourTable(rows, cols)
+    letters = [board[row][col] for row in range(rows) for col in range(cols)]
+    step = wordTrie.step
+    importantStep = importantTrie.step
+    allWords = set()
+    importantFound = []
+    path = []
+
+    def extend(cell, node, importantNode, visited, current_str):
+        path.append(cell)
+        if node is not None and wordTrie.is_word(node):
+            allWords.add(current_str)
+        if importantNode is not None and importantTrie.is_word(importantNode):
+            importantFound.append((current_str, [divmod(index, cols) for index in path]))
+        for neighbour in neighbours[cell]:
+            if not (visited >> neighbour) & 1 and letters[neighbour] is not None:
+                nextNode = step(node, letters[neighbour]) if node is not None else None
+                nextImportantNode = importantStep(importantNode, letters[neighbour]) if importantNode is not None else None
+                if nextNode is not None or nextImportantNode is not None:
+                    extend(neighbour, nextNode, nextImportantNode, visited | (1 << neighbour), current_str + letters[neighbour])
+        path.pop()
+
+    for cell in range(rows * cols):
+        if letters[cell] is None:
+            continue
+        node = step(wordTrie.root, letters[cell])
+        importantNode = importantStep(importantTrie.root, letters[cell])
+        if node is not None or importantNode is not None:
+            extend(cell, node, importantNode, 1 << cell, letters[cell])
+    valid = checkImportantWords(importantFound, importantWords)
+    if metrics is not None:
+        metrics.count("word_finder.analyseBoard.calls")
+        metrics.count("word_finder.analyseBoard.words", len(allWords))
+        metrics.count("word_finder.analyseBoard.invalid", not valid)
+        metrics.add_time("word_finder.analyseBoard", time.perf_counter() - start)
+    return allWords, importantFound, valid
 def calculateSetOfWords(board: list, wordTrie):
-    allWords = []
-    for row in range(len(board)):
-        for col in range(len(board[0])):
-            allWords.append(findWords(board, wordTrie, (row, col)))
-    allWordsJoined = []
-    for sublist in allWords:
-        allWordsJoined += sublist
-    return set([word[0] for word in allWordsJoined])
+    return set([word[0] for word in enumerateWords(board, wordTrie)])
 
 
 if __name__ == "__main__":
@@ -113,4 +227,20 @@ if __name__ == "__main__":
     for word in sorted(list(calculateSetOfWords(startingBoard, wordTrie)),key=len):
         print(word)
 
-    print(validatePuzzle(startingBoard, wordTrie, importantWords))
\ No newline at end of file
+    print(validatePuzzle(startingBoard, wordTrie, importantWords))
+
+    # Check the bitmask engine against the recursive findWords scan and time both.
+    import time
+    recursiveStart = time.perf_counter()
+    for _ in range(20):
+        recursiveWords = []
+        for row in range(len(startingBoard)):
+            for col in range(len(startingBoard[0])):
+                recursiveWords += findWords(startingBoard, wordTrie, (row, col))
+    recursiveTime = (time.perf_counter() - recursiveStart) / 20
+    bitmaskStart = time.perf_counter()
+    for _ in range(20):
+        bitmaskWords = enumerateWords(startingBoard, wordTrie)
+    bitmaskTime = (time.perf_counter() - bitmaskStart) / 20
+    assert recursiveWords == bitmaskWords, "enumerateWords differs from findWords"
+    print(f"findWords: {recursiveTime * 1000:.2f}ms/board, enumerateWords: {bitmaskTime * 1000:.2f}ms/board ({recursiveTime / bitmaskTime:.2f}x)")
\ No newline at end of file
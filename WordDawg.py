@@ -0,0 +1,60 @@
+from WordTrie import TrieNode, WordTrie
+
+class WordDawg(WordTrie):
+    """
+    A WordTrie that can be minimised into a directed acyclic word graph. Words are
+    inserted exactly as with WordTrie; freeze() then merges every group of nodes with
+    identical subtrees (shared suffixes such as -ING, -ED, -S) into a single node.
+    search() is unchanged because the graph still has one path per prefix.
+    """
+    def __init__(self):
+        super().__init__()
+        self.node_count_before_freeze = None
+
+    def node_count(self):
+        seen = {id(self.root)}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            for child in node.children.values():
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    stack.append(child)
+        return len(seen)
+
+    def freeze(self):
+        """
+        Minimises the graph in place and returns (nodes before, nodes after).
+        """
+        if self.frozen:
+            count = self.node_count()
+            return (self.node_count_before_freeze, count)
+        self.node_count_before_freeze = self.node_count()
+        register = {}
+        self.root = self._minimise(self.root, register)
+        self.frozen = True
+        return (self.node_count_before_freeze, self.node_count())
+
+    def _minimise(self, node: TrieNode, register: dict):
+        # Children are minimised first, so equal subtrees already share child objects
+        # and can be compared by identity.
+        for letter, child in node.children.items():
+            node.children[letter] = self._minimise(child, register)
+        signature = (node.is_word, tuple(sorted((letter, id(child)) for letter, child in node.children.items())))
+        if signature in register:
+            return register[signature]
+        register[signature] = node
+        return node
+
+
+if __name__ == "__main__":
+    dawg = WordDawg()
+    with open("english_words.txt", "r") as file:
+        for line in file:
+            word = line.strip()
+            if word:  # Skip empty lines.
+                dawg.insert(word)
+
+    before, after = dawg.freeze()
+    print(f"Trie nodes: {before}, DAWG nodes: {after} ({after / before:.1%})")
+    print(dawg.search("jazz"))
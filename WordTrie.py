@@ -10,8 +10,11 @@ class WordTrie:
     def __init__(self):
         self.root = TrieNode()
         self.valid_chars = set("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+        self.frozen = False  # Shared tries are frozen so no caller can add words to them.
     
     def insert(self, word: str):
+        if self.frozen:
+            raise ValueError("Cannot insert into a frozen trie.")
         node = self.root
         for char in word.upper():
             if char not in self.valid_chars:
@@ -33,6 +36,16 @@ class WordTrie:
                 return (False, [])
             node = node.children[char]
         return (node.is_word, list(node.children.keys()))
+
+    def step(self, node: TrieNode, letter: str):
+        """
+        Cursor-style traversal: returns the child of node for letter (already upper case),
+        or None if no word continues that way. Start from self.root.
+        """
+        return node.children.get(letter)
+
+    def is_word(self, node: TrieNode):
+        return node.is_word
     
     def _build_graph(self, node: TrieNode, current_prefix: str, graph: nx.DiGraph, node_info: dict):
         """
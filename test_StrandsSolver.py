@@ -0,0 +1,193 @@
+import itertools
+import random
+import StrandsSolver
+import StrandsWordFinder
+
+
+def brute_force_partition(components, lengths):
+    # Tries every assignment of a component to each strand.
+    for assignment in itertools.product(range(len(components)), repeat=len(lengths)):
+        sums = [0] * len(components)
+        for component, length in zip(assignment, lengths):
+            sums[component] += length
+        if sums == list(components):
+            return True
+    return False
+
+
+def random_partition_case(rng):
+    lengths = [rng.randint(3, 8) for _ in range(rng.randint(0, 6))]
+    if rng.random() < 0.5:
+        # Components made by grouping the lengths, so that many cases are feasible.
+        groups = [0] * rng.randint(1, 3)
+        for length in lengths:
+            groups[rng.randrange(len(groups))] += length
+        components = [size for size in groups if size]
+        if components and rng.random() < 0.3:
+            components[rng.randrange(len(components))] += rng.choice([-1, 1])
+    else:
+        components = [rng.randint(1, 16) for _ in range(rng.randint(0, 3))]
+    return components, lengths
+
+
+def test_partition_feasible_matches_brute_force():
+    rng = random.Random(0)
+    cache = {}
+    for _ in range(2000):
+        components, lengths = random_partition_case(rng)
+        expected = brute_force_partition(components, lengths)
+        assert StrandsSolver.can_partition_components(components, lengths, cache) == expected, (components, lengths)
+        assert StrandsSolver.can_partition_components(components, lengths) == expected, (components, lengths)
+
+
+def test_luby_sequence():
+    assert [StrandsSolver.luby(i) for i in range(1, 16)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+
+def test_luby_matches_recursive_definition():
+    # luby(i) is 2^(k-1) when i = 2^k - 1, and otherwise repeats the sequence from the
+    # previous power of two.
+    def reference(i):
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        return reference(i - (1 << (k - 1)) + 1)
+
+    assert all(StrandsSolver.luby(i) == reference(i) for i in range(1, 2000))
+
+
+def random_walk(rng, rows, cols, taken, length):
+    path = [rng.choice([cell for cell in range(rows * cols) if cell not in taken])]
+    while len(path) < length:
+        r, c = divmod(path[-1], cols)
+        options = [(r + dr) * cols + c + dc for dr in (-1, 0, 1) for dc in (-1, 0, 1)
+                   if (dr or dc) and 0 <= r + dr < rows and 0 <= c + dc < cols and (r + dr) * cols + c + dc not in taken | set(path)]
+        if not options:
+            return None
+        path.append(rng.choice(options))
+    return path
+
+
+def traces(letters, cols, word):
+    # Every set of cells that word can be traced over, by king moves between lettered cells.
+    found = []
+
+    def extend(path):
+        if len(path) == len(word):
+            found.append(frozenset(path))
+            return
+        r, c = divmod(path[-1], cols)
+        for cell, letter in letters.items():
+            if letter == word[len(path)] and cell not in path and abs(cell // cols - r) <= 1 and abs(cell % cols - c) <= 1:
+                extend(path + [cell])
+
+    for cell, letter in letters.items():
+        if letter == word[0]:
+            extend([cell])
+    return found
+
+
+def has_alternate_trace(letters, cols, words, placed):
+    # placed maps the words on the board to their cells.
+    return any(trace != placed.get(word) for word in set(words.values()) for trace in traces(letters, cols, word))
+
+
+def test_placed_letters_matches_exhaustive_trace():
+    rng = random.Random(0)
+    rows, cols = 4, 5
+    grid = [[r * cols + c + 1 for c in range(cols)] for r in range(rows)]
+    masks = StrandsSolver.GridBitmasks(grid)
+    checked = rejected = 0
+    for _ in range(300):
+        alphabet = "AB" if rng.random() < 0.5 else "ABC"
+        strands = []
+        taken = set()
+        for _ in range(6):
+            path = random_walk(rng, rows, cols, taken, rng.randint(2, 4))
+            if path is not None:
+                strands.append(path)
+                taken.update(path)
+        words = {}
+        for index, path in enumerate(strands):
+            word = "".join(rng.choice(alphabet) for _ in path)
+            if word not in words.values():
+                words[f"W{index}"] = word
+        placed_letters = StrandsSolver.PlacedLetters(masks, words)
+        letters = {}
+        placed = {}
+        for index, path in enumerate(strands):
+            name = f"W{index}"
+            if name not in words:
+                continue
+            word = words[name]
+            nodes = [grid[cell // cols][cell % cols] for cell in path]
+            letters.update(zip(path, word))
+            placed[word] = frozenset(path)
+            # Before this placement no word had a second trace, so place must report exactly
+            # whether one exists now.
+            expected = not has_alternate_trace(letters, cols, words, placed)
+            assert placed_letters.place(name, nodes) == expected, (strands, words, name)
+            checked += 1
+            if not expected:
+                rejected += 1
+                placed_letters.remove(name, nodes)
+                for cell in path:
+                    del letters[cell]
+                del placed[word]
+    assert rejected > 0 and checked - rejected > 0
+
+
+def brute_force_paths(cell, length, free_cells, diagonals_used, rows, cols):
+    # Every simple king-move path of length free cells through cell whose diagonal steps
+    # neither cross a claimed diagonal nor each other, with each path in one direction.
+    paths = set()
+
+    def valid(path):
+        diagonals = dict(diagonals_used)
+        for a, b in zip(path, path[1:]):
+            (r1, c1), (r2, c2) = divmod(a, cols), divmod(b, cols)
+            if r1 != r2 and c1 != c2:
+                square_key = (min(r1, r2), min(c1, c2))
+                diag_type = 1 if (r1 - r2) == (c1 - c2) else 2
+                if diagonals.setdefault(square_key, diag_type) != diag_type:
+                    return False
+        return True
+
+    def extend(path):
+        if len(path) == length:
+            if cell in path and valid(path):
+                paths.add(min(tuple(path), tuple(path[::-1])))
+            return
+        r, c = divmod(path[-1], cols)
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                neighbour = (r + dr) * cols + c + dc
+                if (dr or dc) and 0 <= r + dr < rows and 0 <= c + dc < cols and neighbour in free_cells and neighbour not in path:
+                    extend(path + [neighbour])
+
+    for start in free_cells:
+        extend([start])
+    return paths
+
+
+def test_paths_through_yields_every_path_once():
+    rng = random.Random(0)
+    rows, cols = 3, 4
+    neighbours = StrandsWordFinder.getNeighbourTable(rows, cols)
+    steps = StrandsSolver.get_diagonal_steps(rows, cols)
+    for _ in range(200):
+        free_cells = {cell for cell in range(rows * cols) if rng.random() < 0.85}
+        if not free_cells:
+            continue
+        cell = rng.choice(sorted(free_cells))
+        length = rng.randint(1, 6)
+        diagonals_used = {(rng.randrange(rows - 1), rng.randrange(cols - 1)): rng.choice([1, 2]) for _ in range(rng.randint(0, 2))}
+        claimed_before = dict(diagonals_used)
+        free_mask = sum(1 << free for free in free_cells)
+        yielded = [min(tuple(path), tuple(path[::-1]))
+                   for path in StrandsSolver.paths_through(cell, length, free_mask, diagonals_used, neighbours, steps, rng)]
+        assert len(yielded) == len(set(yielded))
+        assert set(yielded) == brute_force_paths(cell, length, free_cells, claimed_before, rows, cols)
+        assert diagonals_used == claimed_before
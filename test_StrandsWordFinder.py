@@ -0,0 +1,71 @@
+import pytest
+import StrandsWordFinder
+from WordDawg import WordDawg
+from WordTrie import WordTrie
+
+WORDS = ["BURPEE", "CRUNCH", "DEADLIFT", "LUNGE", "PLANK", "SITUP", "SQUAT", "EXERCISE",
+         "CRUE", "CURE", "PLAN", "PLANE", "RUNG", "SUNG", "TIDE", "TIDES", "DIET", "EDIT", "ABBA", "BAA"]
+
+BOARDS = {
+    "empty": [],
+    "zero_width": [[], []],
+    "single": [list("A")],
+    "exercise": [list("SQUATS"),
+                 list("ITPLAN"),
+                 list("UCRUNK"),
+                 list("PHCNGE"),
+                 list("EXERCI"),
+                 list("ESIRUB"),
+                 list("TFILDP"),
+                 list("DEADEE")],
+    "repeated_letters": [list("ABBA"),
+                         list("BAAB"),
+                         list("ABBA")],
+    "blocked_cells": [list("TID"),
+                      [None, "E", "S"],
+                      list("DIE")],
+}
+
+
+def recursive_scan(board, trie):
+    foundWords = []
+    for row in range(len(board)):
+        for col in range(len(board[row])):
+            if board[row][col] is not None:
+                foundWords += StrandsWordFinder.findWords(board, trie, (row, col))
+    return foundWords
+
+
+def make_trie(trie_class):
+    trie = trie_class()
+    for word in WORDS:
+        trie.insert(word)
+    if isinstance(trie, WordDawg):
+        trie.freeze()
+    return trie
+
+
+@pytest.mark.parametrize("trie_class", [WordTrie, WordDawg])
+@pytest.mark.parametrize("name", sorted(BOARDS))
+def test_enumerate_words_matches_find_words(name, trie_class):
+    board = [list(row) for row in BOARDS[name]]
+    trie = make_trie(trie_class)
+    assert StrandsWordFinder.enumerateWords(board, trie) == recursive_scan(board, trie)
+    assert board == BOARDS[name]
+
+
+@pytest.mark.parametrize("name", sorted(BOARDS))
+def test_analyse_board_matches_separate_scans(name):
+    board = [list(row) for row in BOARDS[name]]
+    trie = make_trie(WordTrie)
+    importantWords = ["SQUAT", "CRUNCH"]
+    allWords, _, valid = StrandsWordFinder.analyseBoard(board, trie, importantWords)
+    assert allWords == StrandsWordFinder.calculateSetOfWords(board, trie)
+    assert valid == StrandsWordFinder.validatePuzzle(board, trie, importantWords)
+
+
+def test_empty_board_finds_nothing():
+    trie = make_trie(WordTrie)
+    assert StrandsWordFinder.enumerateWords([], trie) == []
+    assert StrandsWordFinder.calculateSetOfWords([], trie) == set()
+    assert StrandsWordFinder.validatePuzzle([], trie, ["SQUAT"]) is False